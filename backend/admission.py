@@ -0,0 +1,262 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from graphql import parse, GraphQLError
+from graphql.language import OperationDefinitionNode, FieldNode, IntValueNode, VariableNode
+
+# Admission control for GraphQL queries. At most MAX_CONCURRENT_QUERIES are
+# executed at once; further requests wait in a bounded queue ordered by
+# priority, so cheap lookups are served before big scans. When the queue is
+# full or a request has waited too long, it is rejected straight away with
+# 503 and Retry-After instead of piling up until clients time out.
+
+MAX_CONCURRENT_QUERIES = int(os.environ.get("MAX_CONCURRENT_QUERIES", "8"))
+MAX_QUEUED_QUERIES = int(os.environ.get("MAX_QUEUED_QUERIES", "64"))
+QUEUE_TIMEOUT_S = float(os.environ.get("QUEUE_TIMEOUT_S", "5"))
+RETRY_AFTER_S = int(os.environ.get("RETRY_AFTER_S", "1"))
+
+# Lower values are served first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_NAMES = {"high": PRIORITY_HIGH, "normal": PRIORITY_NORMAL, "low": PRIORITY_LOW}
+
+# Fields answered from an index or a cached summary
+CHEAP_FIELDS = {"item", "histogram", "quantiles", "__typename", "__schema", "__type"}
+
+# items queries returning at most this many rows are not considered scans
+SMALL_PAGE_LIMIT = 100
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded priority queue
+    """
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_QUERIES, max_queued: int = MAX_QUEUED_QUERIES,
+                 queue_timeout: float = QUEUE_TIMEOUT_S):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.counters = {"admitted": 0, "queued": 0, "rejected": 0, "shed": 0, "timed_out": 0}
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Wait for an execution slot. Returns False if the request should be rejected.
+        """
+        # Waiters that timed out or were cancelled stay queued until they resume;
+        # drop them now so they are neither counted nor picked for shedding
+        if any(waiter.done() for _, _, waiter in self._queue):
+            self._queue = [entry for entry in self._queue if not entry[2].done()]
+            heapq.heapify(self._queue)
+
+        if self.active < self.max_concurrent and not self._queue:
+            self.active += 1
+            self.counters["admitted"] += 1
+            return True
+
+        if len(self._queue) >= self.max_queued:
+            # Queue is full: make room by shedding the least important waiter,
+            # unless the new request is no more important than any of them
+            worst = max(self._queue)
+            if worst[0] <= priority:
+                self.counters["rejected"] += 1
+                return False
+            self._remove(worst)
+            worst[2].set_result(False)
+            self.counters["shed"] += 1
+
+        entry = (priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, entry)
+        self.counters["queued"] += 1
+
+        try:
+            admitted = await asyncio.wait_for(entry[2], self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._remove(entry)
+            self.counters["timed_out"] += 1
+            return False
+        except BaseException:
+            # The client went away while waiting; hand the slot on if we were just given one
+            self._remove(entry)
+            if entry[2].done() and not entry[2].cancelled() and entry[2].result():
+                self.release()
+            raise
+
+        if admitted:
+            self.counters["admitted"] += 1
+        return admitted
+
+    def release(self):
+        """
+        Free an execution slot, handing it directly to the next waiter if there is one
+        """
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def _remove(self, entry: Tuple[int, int, asyncio.Future]):
+        if entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current load and counters since startup
+        """
+        names = {priority: name for name, priority in PRIORITY_NAMES.items()}
+        depth_by_priority = {name: 0 for name in PRIORITY_NAMES}
+        for priority, _, _ in self._queue:
+            depth_by_priority[names[priority]] += 1
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": len(self._queue),
+            "queue_depth_by_priority": depth_by_priority,
+            "max_queued": self.max_queued,
+            **self.counters,
+        }
+
+@lru_cache(maxsize=1024)
+def _top_level_fields(query: str, operation_name: Optional[str]) -> Optional[Tuple[str, Tuple[Tuple[str, Any], ...]]]:
+    """
+    Operation type and top-level fields of a query, as (name, limit argument) pairs
+    """
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return None
+
+    operations = [d for d in document.definitions if isinstance(d, OperationDefinitionNode)]
+    if operation_name:
+        operations = [d for d in operations if d.name and d.name.value == operation_name]
+    if len(operations) != 1:
+        return None
+
+    fields = []
+    for selection in operations[0].selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            return None
+        limit: Any = 10  # default page size of the items field
+        for argument in selection.arguments or ():
+            if argument.name.value == "limit":
+                if isinstance(argument.value, IntValueNode):
+                    limit = int(argument.value.value)
+                elif isinstance(argument.value, VariableNode):
+                    limit = ("$", argument.value.name.value)
+                else:
+                    limit = None
+        fields.append((selection.name.value, limit))
+    return operations[0].operation.value, tuple(fields)
+
+def classify(query: Optional[str], variables: Optional[Dict[str, Any]] = None,
+             operation_name: Optional[str] = None) -> int:
+    """
+    Priority of a GraphQL request: lookups and cached summaries are high priority,
+    small pages normal, and large or unbounded scans low
+    """
+    if not query:
+        return PRIORITY_NORMAL
+    parsed = _top_level_fields(query, operation_name)
+    if parsed is None:
+        return PRIORITY_NORMAL
+
+    operation, fields = parsed
+    if operation != "query":
+        return PRIORITY_NORMAL
+
+    priority = PRIORITY_HIGH
+    for name, limit in fields:
+        if name in CHEAP_FIELDS:
+            continue
+        if isinstance(limit, tuple):
+            limit = (variables or {}).get(limit[1], 10)
+        if isinstance(limit, int) and limit <= SMALL_PAGE_LIMIT:
+            priority = max(priority, PRIORITY_NORMAL)
+        else:
+            priority = PRIORITY_LOW
+    return priority
+
+def _request_priority(scope: Dict[str, Any], body: bytes) -> int:
+    try:
+        if scope["method"] == "GET":
+            params = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()}
+            variables = json.loads(params["variables"]) if params.get("variables") else None
+        else:
+            params = json.loads(body) if body else {}
+            variables = params.get("variables")
+        priority = classify(params.get("query"), variables, params.get("operationName"))
+    except (ValueError, AttributeError, TypeError):
+        priority = PRIORITY_NORMAL
+
+    # Clients may only lower the priority of their own requests (e.g. background
+    # jobs), never raise it, or a scan could jump ahead of the lookups
+    headers = dict(scope.get("headers") or [])
+    explicit = headers.get(b"x-priority", b"").decode("latin-1").lower()
+    if explicit in PRIORITY_NAMES:
+        priority = max(priority, PRIORITY_NAMES[explicit])
+    return priority
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware putting the admission controller in front of the GraphQL endpoint
+    """
+    def __init__(self, app, controller: AdmissionController, path: str = "/graphql"):
+        self.app = app
+        self.controller = controller
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].rstrip("/") != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        # Read the body up front to classify the request, then replay it downstream
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        if not await self.controller.acquire(_request_priority(scope, body)):
+            await self._reject(send)
+            return
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release()
+
+    async def _reject(self, send):
+        content = json.dumps({"errors": [{"message": "Server is overloaded, please retry later"}]}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(content)).encode("latin-1")),
+                (b"retry-after", str(RETRY_AFTER_S).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
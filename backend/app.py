@@ -1,14 +1,85 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 import strawberry
 from strawberry.fastapi import GraphQLRouter
+from strawberry.dataloader import DataLoader
+from contextlib import asynccontextmanager
+from typing import Optional
 from schema import schema
-import uvicorn
+from database import get_data_from_database, get_id_index, get_column, get_details_index, memory_report
+from resolvers import (
+    get_item_records, get_item_record_by_id, get_item_detail_records, load_item_details, summary_cache_report
+)
+from http_cache import graphql_etag_middleware
+from admission import AdmissionController, AdmissionMiddleware
+from export import EXPORT_FORMATS, export_table, serialize_table
+from models import ItemFilter
+from startup import run_startup_pipeline, readiness, is_ready, profile_imports, ReadinessMiddleware
+import asyncio
+import os
+import sys
+
+# Responses smaller than this (in bytes) are not worth compressing
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", "1000"))
+
+# Representative query executed once at startup, so parsing, validation and
+# the resolvers' caches are warm before the first real request
+WARM_UP_QUERY = """
+query WarmUp {
+    items(limit: 1) { id name value category }
+    item(id: "1") { id }
+    histogram { total }
+}
+"""
+
+def build_indexes():
+    get_id_index()
+    get_details_index()
+    get_column('value')
+    get_column('category')
+
+def warm_up_schema():
+    schema.execute_sync(WARM_UP_QUERY)
+
+STARTUP_PHASES = [
+    ("data", get_data_from_database),
+    ("indexes", build_indexes),
+    ("schema", warm_up_schema),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in a worker thread so /health keeps answering while data loads;
+    # /ready only reports ready once every phase has completed, and /graphql
+    # answers 503 until then
+    warm_up = asyncio.ensure_future(asyncio.to_thread(run_startup_pipeline, STARTUP_PHASES))
+    yield
+    warm_up.cancel()
 
 # Create FastAPI app
-app = FastAPI(title="GraphQL with Python Demo")
+app = FastAPI(title="GraphQL with Python Demo", lifespan=lifespan)
+
+# Limit concurrent GraphQL executions and shed load when the queue is full.
+# Added first so it sits innermost: revalidations answered with 304 never wait for a slot.
+admission = AdmissionController()
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+# Compress large responses and support conditional GET requests for GraphQL queries
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+app.middleware("http")(graphql_etag_middleware)
+
+# Added last so it sits outermost: until warm-up has finished, GraphQL requests
+# are turned away before they take an admission slot or compute an ETag
+app.add_middleware(ReadinessMiddleware)
+
+# Per-request context: loaders are created for each request so that batching
+# and caching never leak between requests
+async def get_context():
+    return {"detail_loader": DataLoader(load_fn=load_item_details)}
 
 # Create GraphQL endpoint
-graphql_app = GraphQLRouter(schema)
+graphql_app = GraphQLRouter(schema, context_getter=get_context)
 app.include_router(graphql_app, prefix="/graphql")
 
 # Root endpoint
@@ -17,13 +88,109 @@ def read_root():
     return {
         "message": "Welcome to GraphQL with Python Demo",
         "documentation": "/graphql",
-        "healthcheck": "/health"
+        "rest_api": "/api/items",
+        "healthcheck": "/health",
+        "readiness": "/ready"
     }
 
-# Health check endpoint
+# Health check endpoint - the process is up, even if it can't serve data yet
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+# Readiness endpoint - only take traffic once data is loaded and the schema warmed up
+@app.get("/ready")
+def readiness_check():
+    return JSONResponse(status_code=200 if is_ready() else 503, content=readiness())
+
+# REST endpoints - served from the same data store as the GraphQL resolvers
+# so the REST comparison page measures equivalent work on both sides
+@app.get("/api/items")
+def list_items(limit: int = 10, offset: int = 0, category: Optional[str] = None):
+    """List items with pagination and filtering, returning full records"""
+    records, total = get_item_records(limit, offset, category)
+    return {
+        "data": [record.to_dict() for record in records],
+        "pagination": {
+            "total": total,
+            "offset": offset,
+            "limit": limit
+        }
+    }
+
+@app.get("/api/items/{item_id}")
+def read_item(item_id: str):
+    """Get a single item by ID"""
+    record = get_item_record_by_id(item_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Item {item_id} not found")
+    return record.to_dict()
+
+@app.get("/api/items/{item_id}/details")
+def read_item_details(item_id: str):
+    """Get the details for a single item"""
+    record = get_item_record_by_id(item_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Item {item_id} not found")
+    return {
+        "id": record.id,
+        "name": record.name,
+        "details": get_item_detail_records(item_id)
+    }
+
+# Admission control statistics: load, queue depth and rejections
+@app.get("/debug/admission")
+def admission_stats():
+    return admission.stats()
+
+# Approximate memory held by the data layer: per column, per index and per cache
+@app.get("/debug/memory")
+def memory_stats():
+    seen = set()
+    report = memory_report(seen)
+    report["caches"]["summary_cache"] = summary_cache_report(seen)
+    return report
+
+# Bulk export of column projections as Arrow IPC or Parquet
+@app.get("/api/export")
+def export_items(
+    columns: Optional[str] = None,
+    format: str = "arrow",
+    category: Optional[str] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None
+):
+    """Export the selected columns (comma separated, default all) of the matching items"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    
+    filter = None
+    if category or min_value is not None or max_value is not None:
+        filter = ItemFilter(category=category, min_value=min_value, max_value=max_value)
+    
+    try:
+        names = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+        table = export_table(names, filter)
+        content = serialize_table(table, format)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Export requires pyarrow to be installed")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Response(
+        content=content,
+        media_type=EXPORT_FORMATS[format],
+        headers={"X-Row-Count": str(table.num_rows)}
+    )
+
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    if "--profile-startup" in sys.argv:
+        # Show where startup time goes instead of serving
+        print("Slowest imports (cumulative ms):")
+        for name, duration in profile_imports("app"):
+            print(f"  {name:<40} {duration:>10.2f}")
+        run_startup_pipeline(STARTUP_PHASES)
+        print(readiness())
+    else:
+        import uvicorn
+        uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,61 +1,424 @@
-import pandas as pd
+import hashlib
 import os
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing import get_context
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+from models import ChangeOperation, DataChange, PartitionInfo, ItemModel, is_missing
+from partitions import resolve_partition_paths, read_partition, summarize_partition
+from startup import timed_import
+from memory import deep_sizeof
+import events
 
-# File path to the dataset
-DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'dataset.csv')
+# pandas and numpy are only imported once data is actually loaded, so
+# importing this module (and the app) stays fast
+if TYPE_CHECKING:
+    import numpy as np
 
-# In-memory cache for the data
+# Path to the dataset: a single CSV file, a directory of CSV partitions
+# or a glob pattern matching them (e.g. data/daily/2023-*.csv)
+DATASET_PATH = os.environ.get(
+    "DATASET_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'dataset.csv')
+)
+
+# Path to the related item details: a CSV file with an item_id column
+DETAILS_PATH = os.environ.get(
+    "DETAILS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'details.csv')
+)
+
+# Number of processes used to parse partitions in parallel
+DATASET_LOAD_WORKERS = int(os.environ.get("DATASET_LOAD_WORKERS", "0")) or os.cpu_count() or 1
+
+# In-memory cache for the data, and the partitions it was merged from
 _data_cache = None
+_partitions: List[PartitionInfo] = []
 
-def get_data_from_database() -> List[Dict[str, Any]]:
+# Serializes loading, so a request arriving during warm-up waits for the
+# load in progress instead of starting a second one
+_load_lock = threading.RLock()
+
+# Version of the cached data, bumped whenever the data changes, and a
+# fingerprint of the source it was loaded from. Together they identify
+# the exact dataset a response was computed from (used for ETags).
+_data_version = 0
+_data_fingerprint = ""
+
+def _read_partitions(paths: List[str]) -> List[Dict[str, Any]]:
     """
-    Loads data from the CSV file and returns it as a list of dictionaries.
-    Uses a simple caching mechanism to avoid reading the file for every query.
+    Parse the partition files, in parallel across processes when there are several
     """
-    global _data_cache
+    if len(paths) == 1 or DATASET_LOAD_WORKERS == 1:
+        return [read_partition(path) for path in paths]
     
-    if _data_cache is None:
-        # Check if file exists
-        if not os.path.exists(DATASET_PATH):
-            # For development, return some dummy data if file doesn't exist
-            _data_cache = [
-                {"id": "1", "name": "Item 1", "value": 10.5, "category": "A"},
-                {"id": "2", "name": "Item 2", "value": 20.0, "category": "B"},
-                {"id": "3", "name": "Item 3", "value": 30.7, "category": "A"},
-                {"id": "4", "name": "Item 4", "value": 15.2, "category": "C"},
-                {"id": "5", "name": "Item 5", "value": 25.8, "category": "B"},
-                {"id": "6", "name": "Item 6", "value": 35.9, "category": "A"},
-                {"id": "7", "name": "Item 7", "value": 18.3, "category": "C"},
-                {"id": "8", "name": "Item 8", "value": 22.1, "category": "B"},
-                {"id": "9", "name": "Item 9", "value": 40.5, "category": "A"},
-                {"id": "10", "name": "Item 10", "value": 33.7, "category": "C"},
-            ]
-            return _data_cache
+    # Workers are spawned rather than forked, as the server process has threads running
+    workers = min(DATASET_LOAD_WORKERS, len(paths))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+        return list(executor.map(read_partition, paths))
+
+def _load_dataset() -> Tuple[List[ItemModel], List[PartitionInfo], str]:
+    """
+    Reads the dataset, returning its records, its partitions and a fingerprint of the source
+    """
+    paths = resolve_partition_paths(DATASET_PATH)
+    
+    # Check if file exists
+    if not paths:
+        # For development, return some dummy data if file doesn't exist
+        records = [
+            {"id": "1", "name": "Item 1", "value": 10.5, "category": "A"},
+            {"id": "2", "name": "Item 2", "value": 20.0, "category": "B"},
+            {"id": "3", "name": "Item 3", "value": 30.7, "category": "A"},
+            {"id": "4", "name": "Item 4", "value": 15.2, "category": "C"},
+            {"id": "5", "name": "Item 5", "value": 25.8, "category": "B"},
+            {"id": "6", "name": "Item 6", "value": 35.9, "category": "A"},
+            {"id": "7", "name": "Item 7", "value": 18.3, "category": "C"},
+            {"id": "8", "name": "Item 8", "value": 22.1, "category": "B"},
+            {"id": "9", "name": "Item 9", "value": 40.5, "category": "A"},
+            {"id": "10", "name": "Item 10", "value": 33.7, "category": "C"},
+        ]
+        summary = summarize_partition(records)
+        partition = PartitionInfo(source="dummy", start=0, stop=len(records), min_value=summary["min_value"],
+                                  max_value=summary["max_value"], categories=summary["categories"])
+        return [ItemModel.from_dict(record) for record in records], [partition], "dummy"
+    
+    try:
+        # Load the dataset
+        stats = [(path, os.stat(path)) for path in paths]
+        parsed = _read_partitions(paths)
         
-        try:
-            # Load the dataset
-            df = pd.read_csv(DATASET_PATH)
+        # Merge the partitions into one list, recording where each one ended up
+        records, partitions = [], []
+        for part in parsed:
+            start = len(records)
             
-            # Convert DataFrame to list of dictionaries
-            _data_cache = df.to_dict(orient='records')
+            # If the partition doesn't have an 'id' column, number its rows by position in the merged data
+            if not part["has_id"]:
+                for i, item in enumerate(part["records"]):
+                    item['id'] = str(start + i + 1)
             
-            # If the dataset doesn't have an 'id' column, add one
-            if 'id' not in df.columns:
-                for i, item in enumerate(_data_cache):
-                    item['id'] = str(i + 1)
-                    
-        except Exception as e:
-            print(f"Error loading dataset: {e}")
-            # Return empty list in case of error
-            _data_cache = []
+            records.extend(ItemModel.from_dict(item) for item in part["records"])
+            partitions.append(PartitionInfo(source=part["path"], start=start, stop=len(records),
+                                            min_value=part["min_value"], max_value=part["max_value"],
+                                            categories=part["categories"]))
+        
+        fingerprint = hashlib.sha256("|".join(
+            f"{path}:{stat.st_size:x}-{stat.st_mtime_ns:x}" for path, stat in stats
+        ).encode("utf-8")).hexdigest()[:16]
+        return records, partitions, fingerprint
+    except Exception as e:
+        print(f"Error loading dataset: {e}")
+        # Return empty list in case of error
+        return [], [], "error"
+
+def get_data_from_database() -> List[ItemModel]:
+    """
+    Loads data from the CSV file and returns it as a list of compact item records.
+    Uses a simple caching mechanism to avoid reading the file for every query.
+    """
+    global _data_cache, _partitions, _data_version, _data_fingerprint
+    
+    if _data_cache is None:
+        with _load_lock:
+            if _data_cache is None:
+                records, _partitions, _data_fingerprint = _load_dataset()
+                _data_version += 1
+                _data_cache = records
     
     return _data_cache
 
+def get_partitions() -> List[PartitionInfo]:
+    """
+    Returns the partitions of the cached data, in row order
+    """
+    get_data_from_database()
+    return _partitions
+
+def is_data_loaded() -> bool:
+    """
+    Whether the dataset has been loaded into memory
+    """
+    return _data_cache is not None
+
+# Item details grouped by item ID, built once on first use
+_details_index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+def _load_details() -> List[Dict[str, Any]]:
+    """
+    Reads the item details, one or more rows per item
+    """
+    if not os.path.exists(DETAILS_PATH):
+        # For development, derive one detail row per item of the built-in dummy
+        # dataset; a real dataset without a details file simply has no details
+        if get_data_fingerprint() != "dummy":
+            return []
+        return [
+            {
+                "item_id": item.id,
+                "description": f"Detailed description for {item.name}",
+                "created_at": f"2023-05-{(index % 28) + 1:02d}T14:30:00Z",
+                "updated_at": f"2023-06-{(index % 28) + 1:02d}T09:45:00Z",
+                "extra_info": f"Category {item.category} item",
+            }
+            for index, item in enumerate(get_data_from_database())
+        ]
+    
+    try:
+        pd = timed_import("pandas")
+        # Read every column as text, so dates or codes aren't parsed as floats
+        # (2023 -> "2023.0"); blank cells still come back as NaN
+        df = pd.read_csv(DETAILS_PATH, dtype=str)
+        return [
+            {key: None if is_missing(value) else value for key, value in row.items()}
+            for row in df.to_dict(orient='records')
+        ]
+    except Exception as e:
+        print(f"Error loading item details: {e}")
+        return []
+
+def get_details_index() -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Returns the item details grouped by item ID
+    """
+    global _details_index
+    
+    if _details_index is None:
+        with _load_lock:
+            if _details_index is None:
+                index: Dict[str, List[Dict[str, Any]]] = {}
+                for detail in _load_details():
+                    index.setdefault(str(detail.get('item_id', '')), []).append(detail)
+                _details_index = index
+    
+    return _details_index
+
+# Index of record positions by ID, rebuilt whenever the data version changes
+_id_index: Dict[str, int] = {}
+_id_index_version = 0
+
+def get_id_index() -> Dict[str, int]:
+    """
+    Returns a mapping from item ID to the position of the record in the cached data
+    """
+    global _id_index, _id_index_version
+    
+    data = get_data_from_database()
+    if _id_index_version != _data_version:
+        _id_index = {item.id: index for index, item in enumerate(data)}
+        _id_index_version = _data_version
+    
+    return _id_index
+
+# Names of the columns of the dataset, rebuilt whenever the data version changes
+_columns: List[str] = []
+_columns_version = 0
+
+def get_columns() -> List[str]:
+    """
+    Returns the names of the columns of the dataset: the schema fields followed
+    by every extra column found in any record (partitions may differ)
+    """
+    global _columns, _columns_version
+    
+    data = get_data_from_database()
+    if _columns_version != _data_version:
+        # Records share their tuple of extra column names, so only look at each distinct one
+        column_sets = {id(item.extra_columns): item.extra_columns for item in data}
+        columns = dict.fromkeys(ItemModel.FIELDS) if data else {}
+        for extra_columns in column_sets.values():
+            columns.update(dict.fromkeys(extra_columns))
+        _columns = list(columns)
+        _columns_version = _data_version
+    
+    return _columns
+
+# Columns of the cached data as numpy arrays, for vectorized computations.
+# Built on first use and dropped whenever the data version changes.
+_column_cache: Dict[str, "np.ndarray"] = {}
+_column_cache_version = 0
+
+def get_column(field: str) -> "np.ndarray":
+    """
+    Returns a column of the cached data as a numpy array.
+    Numeric columns are returned as float arrays (missing values become NaN),
+    other columns as object arrays.
+    """
+    global _column_cache, _column_cache_version
+    
+    np = timed_import("numpy")
+    data = get_data_from_database()
+    if _column_cache_version != _data_version:
+        _column_cache = {}
+        _column_cache_version = _data_version
+    
+    if field not in _column_cache:
+        values = [item.get(field) for item in data]
+        if all(v is None or isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+            column = np.array([np.nan if v is None else v for v in values], dtype=float)
+        else:
+            column = np.array(values, dtype=object)
+        _column_cache[field] = column
+    
+    return _column_cache[field]
+
+def get_data_version() -> int:
+    """
+    Returns the version of the cached data, loading it first if needed
+    """
+    get_data_from_database()
+    return _data_version
+
+def get_data_fingerprint() -> str:
+    """
+    Returns a fingerprint of the source the cached data was loaded from
+    """
+    get_data_from_database()
+    return _data_fingerprint
+
 def refresh_data_cache():
     """
     Force a refresh of the data cache
     """
-    global _data_cache
+    global _data_cache, _details_index
     _data_cache = None
-    return get_data_from_database()
\ No newline at end of file
+    _details_index = None
+    data = get_data_from_database()
+    events.publish(DataChange(version=_data_version, operation=ChangeOperation.RESET))
+    return data
+
+# Writes replace the cached list (copy-on-write) rather than modifying it in
+# place, so readers that already hold a reference keep a consistent view.
+
+def _widen(partition: PartitionInfo, record: ItemModel) -> PartitionInfo:
+    """
+    Extend a partition's metadata so that it still covers a written record
+    """
+    value = record.value
+    min_value, max_value, categories = partition.min_value, partition.max_value, partition.categories
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value == value:
+        min_value = value if min_value is None else min(min_value, value)
+        max_value = value if max_value is None else max(max_value, value)
+    if categories is not None:
+        categories = categories | {record.category}
+    return replace(partition, min_value=min_value, max_value=max_value, categories=categories)
+
+def _adjust_partitions(operation: ChangeOperation, index: int, record: Optional[ItemModel]) -> List[PartitionInfo]:
+    """
+    Partition ranges and metadata after a write at the given row position.
+    Metadata is only ever widened, so it may become less selective but never wrong.
+    """
+    partitions = list(_partitions)
+    if not partitions:
+        partitions = [PartitionInfo(source="writes", start=0, stop=0)]
+    
+    if operation == ChangeOperation.INSERT:
+        # New rows are appended to the last partition
+        partitions[-1] = replace(_widen(partitions[-1], record), stop=partitions[-1].stop + 1)
+    elif operation == ChangeOperation.UPDATE:
+        for i, partition in enumerate(partitions):
+            if partition.start <= index < partition.stop:
+                partitions[i] = _widen(partition, record)
+    elif operation == ChangeOperation.DELETE:
+        # Rows after the deleted one move up by one position
+        for i, partition in enumerate(partitions):
+            if partition.start > index:
+                partitions[i] = replace(partition, start=partition.start - 1, stop=partition.stop - 1)
+            elif partition.stop > index:
+                partitions[i] = replace(partition, stop=partition.stop - 1)
+    
+    return partitions
+
+def _commit(data: List[ItemModel], operation: ChangeOperation, id: str, index: int,
+            record: Optional[ItemModel] = None, previous: Optional[ItemModel] = None):
+    global _data_cache, _partitions, _data_version, _details_index
+    _partitions = _adjust_partitions(operation, index, record)
+    _data_cache = data
+    _data_version += 1
+    if _data_fingerprint == "dummy" and not os.path.exists(DETAILS_PATH):
+        # Details derived from the items are rebuilt on next use
+        _details_index = None
+    events.publish(DataChange(version=_data_version, operation=operation, id=id, record=record, previous=previous))
+
+def insert_item(fields: Dict[str, Any]) -> ItemModel:
+    """
+    Add a new item to the dataset and return the stored record
+    """
+    data = get_data_from_database()
+    numeric_ids = [int(item.id) for item in data if item.id.isdigit()]
+    record = ItemModel.from_dict({**fields, "id": str(max(numeric_ids, default=0) + 1)})
+    
+    _commit(data + [record], ChangeOperation.INSERT, record.id, len(data), record=record)
+    return record
+
+def update_item(id: str, fields: Dict[str, Any]) -> Optional[ItemModel]:
+    """
+    Update the fields of an existing item, returning the new record or None if it doesn't exist
+    """
+    index = get_id_index().get(id)
+    if index is None:
+        return None
+    
+    data = list(get_data_from_database())
+    previous = data[index]
+    data[index] = ItemModel.from_dict({**previous.to_dict(), **fields})
+    
+    _commit(data, ChangeOperation.UPDATE, id, index, record=data[index], previous=previous)
+    return data[index]
+
+def delete_item(id: str) -> bool:
+    """
+    Remove an item from the dataset, returning whether it existed
+    """
+    index = get_id_index().get(id)
+    if index is None:
+        return False
+    
+    data = get_data_from_database()
+    _commit(data[:index] + data[index + 1:], ChangeOperation.DELETE, id, index, previous=data[index])
+    return True
+
+def memory_report(seen: Optional[set] = None) -> Dict[str, Any]:
+    """
+    Approximate bytes held by the data layer, broken down per column, per index
+    and per cache. Objects shared between structures (e.g. the ID strings that
+    are both a column and the keys of the ID index) are counted once, under the
+    first structure listed, so the figures add up to the total.
+    """
+    seen = set() if seen is None else seen
+    data = get_data_from_database()
+    
+    columns: Dict[str, Dict[str, Any]] = {}
+    for field in ItemModel.FIELDS:
+        before = len(seen)
+        size = sum(deep_sizeof(getattr(item, field), seen) for item in data)
+        columns[field] = {"bytes": size, "distinct_objects": len(seen) - before}
+    for item in data:
+        for field, value in zip(item.extra_columns, item.extra_values):
+            column = columns.setdefault(field, {"bytes": 0, "distinct_objects": 0})
+            before = len(seen)
+            column["bytes"] += deep_sizeof(value, seen)
+            column["distinct_objects"] += len(seen) - before
+    
+    # The slotted record objects themselves (with their tuples of extra values)
+    # and the list holding them
+    row_objects = sum(deep_sizeof(item, seen) for item in data)
+    rows = {
+        "count": len(data),
+        "record_bytes": row_objects,
+        "list_bytes": deep_sizeof(data, seen),
+    }
+    rows["bytes_per_row"] = round((rows["record_bytes"] + rows["list_bytes"] + sum(
+        c["bytes"] for c in columns.values())) / len(data), 1) if data else 0.0
+    
+    indexes = {
+        "id_index": deep_sizeof(_id_index, seen),
+        "details_index": deep_sizeof(_details_index, seen) if _details_index is not None else 0,
+        "partitions": deep_sizeof(_partitions, seen),
+    }
+    caches = {
+        "column_cache": {field: deep_sizeof(column, seen) for field, column in _column_cache.items()},
+    }
+    
+    return {"version": _data_version, "rows": rows, "columns": columns, "indexes": indexes, "caches": caches}
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Dict
+from models import ChangeOperation, DataChange
+
+# Simple in-process publish/subscribe for dataset changes.
+# Changes are published from whichever thread modified the data and handed
+# over to each subscriber's event loop, where they are queued until the
+# subscription delivers them.
+
+# Maximum number of undelivered changes per subscriber. A subscriber that
+# falls further behind gets a single RESET instead and has to refetch.
+MAX_PENDING_CHANGES = 1000
+
+_subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+
+def _deliver(queue: asyncio.Queue, change: DataChange):
+    if queue.full():
+        while not queue.empty():
+            queue.get_nowait()
+        change = DataChange(version=change.version, operation=ChangeOperation.RESET)
+    queue.put_nowait(change)
+
+def publish(change: DataChange):
+    """
+    Publish a change to every active subscriber
+    """
+    for queue, loop in list(_subscribers.items()):
+        try:
+            loop.call_soon_threadsafe(_deliver, queue, change)
+        except RuntimeError:
+            # The subscriber's event loop has been closed
+            _subscribers.pop(queue, None)
+
+def subscribe() -> asyncio.Queue:
+    """
+    Register a subscriber on the running event loop and return its queue of changes
+    """
+    queue = asyncio.Queue(maxsize=MAX_PENDING_CHANGES)
+    _subscribers[queue] = asyncio.get_running_loop()
+    return queue
+
+def unsubscribe(queue: asyncio.Queue):
+    """
+    Stop delivering changes to a subscriber
+    """
+    _subscribers.pop(queue, None)
@@ -0,0 +1,153 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import strawberry
+from graphql import parse, GraphQLError
+from strawberry.directive import DirectiveLocation
+from strawberry.extensions import SchemaExtension
+
+# Opt-in query explain mode. When a request carries the X-Explain header, or
+# its operation is marked with the @explain directive, resolvers report how
+# they accessed the data and the report is returned in the response extensions:
+#
+#   query @explain { items(category: "A") { id } }
+#
+# When explain mode is off, start() returns None and the helpers do nothing.
+
+EXPLAIN_HEADER = "x-explain"
+EXPLAIN_HEADER_VALUES = ("1", "true", "yes")
+
+_current_plan: ContextVar[Optional[Dict[str, Any]]] = ContextVar("query_plan", default=None)
+
+@strawberry.directive(
+    locations=[DirectiveLocation.QUERY],
+    description="Report the access path of each resolver in the response extensions"
+)
+def explain():
+    # Operation directives aren't executed; ExplainExtension looks for it in the document
+    pass
+
+def header_requests_explain(value: Optional[str]) -> bool:
+    """
+    Whether an X-Explain header value turns explain mode on
+    """
+    return (value or "").lower() in EXPLAIN_HEADER_VALUES
+
+def document_requests_explain(document: Any, operation_name: Optional[str] = None) -> bool:
+    """
+    Whether the executed operation of a parsed document carries the @explain directive
+    """
+    for definition in getattr(document, "definitions", []):
+        name = getattr(definition, "name", None)
+        if operation_name and (name is None or name.value != operation_name):
+            continue
+        if any(directive.name.value == "explain" for directive in getattr(definition, "directives", None) or []):
+            return True
+    return False
+
+@lru_cache(maxsize=1024)
+def query_requests_explain(query: str, operation_name: Optional[str] = None) -> bool:
+    """
+    Whether a query string asks for explain mode through the @explain directive
+    """
+    if "@explain" not in query:
+        return False
+    try:
+        return document_requests_explain(parse(query), operation_name)
+    except GraphQLError:
+        return False
+
+def start(resolver: str, **details) -> Optional[Dict[str, Any]]:
+    """
+    Begin the report of a resolver call, or return None if explain mode is off
+    """
+    plan = _current_plan.get()
+    if plan is None:
+        return None
+    report = {"resolver": resolver, **details, "phases_ms": {}}
+    plan["resolvers"].append(report)
+    return report
+
+def note(report: Optional[Dict[str, Any]], **details):
+    """
+    Add details to a resolver report
+    """
+    if report is not None:
+        report.update(details)
+
+@contextmanager
+def phase(report: Optional[Dict[str, Any]], name: str):
+    """
+    Time a phase of a resolver call
+    """
+    if report is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start_time) * 1000
+        report["phases_ms"][name] = round(report["phases_ms"].get(name, 0.0) + elapsed, 3)
+
+def _summarize(plan: Dict[str, Any]) -> Dict[str, Any]:
+    resolvers: List[Dict[str, Any]] = plan["resolvers"]
+    return {
+        "phases_ms": plan["phases_ms"],
+        "resolvers": resolvers,
+        "rows_examined": sum(r.get("rows_examined", 0) for r in resolvers),
+        "rows_returned": sum(r.get("rows_returned", 0) for r in resolvers),
+        "full_scans": sum(1 for r in resolvers if r.get("access_path") == "full_scan"),
+    }
+
+class ExplainExtension(SchemaExtension):
+    """
+    Collects resolver reports for requests that ask for them and adds them to
+    the response extensions, along with the time spent in each request phase
+    """
+    def on_operation(self):
+        self.plan = None
+        self.phases_ms: Dict[str, float] = {}
+        yield
+
+    @contextmanager
+    def _timed(self, name: str):
+        start_time = time.perf_counter()
+        yield
+        self.phases_ms[name] = round((time.perf_counter() - start_time) * 1000, 3)
+
+    def on_parse(self):
+        with self._timed("parse"):
+            yield
+
+    def on_validate(self):
+        with self._timed("validate"):
+            yield
+
+    def on_execute(self):
+        if not self._requested():
+            yield
+            return
+
+        self.plan = {"phases_ms": self.phases_ms, "resolvers": []}
+        token = _current_plan.set(self.plan)
+        try:
+            with self._timed("execute"):
+                yield
+        finally:
+            _current_plan.reset(token)
+
+    def _requested(self) -> bool:
+        context = self.execution_context.context
+        request = context.get("request") if isinstance(context, dict) else getattr(context, "request", None)
+        if request is not None and header_requests_explain(request.headers.get(EXPLAIN_HEADER)):
+            return True
+        return document_requests_explain(self.execution_context.graphql_document,
+                                         self.execution_context.operation_name)
+
+    def get_results(self) -> Dict[str, Any]:
+        if self.plan is None:
+            return {}
+        return {"explain": _summarize(self.plan)}
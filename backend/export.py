@@ -0,0 +1,69 @@
+import io
+from typing import List, Optional
+from database import get_column, get_columns
+from models import ItemFilter, is_missing
+from resolvers import select_rows
+from startup import timed_import
+
+# Bulk export of column projections in columnar formats, so analytics clients
+# can load large extracts without JSON encoding and decoding every row.
+# Requires pyarrow, which is imported on first use.
+
+EXPORT_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def _as_text(value) -> Optional[str]:
+    if value is None or is_missing(value):
+        return None
+    # pandas reads whole numbers in a column with blanks as floats (5 -> 5.0)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def export_table(columns: Optional[List[str]] = None, filter: Optional[ItemFilter] = None):
+    """
+    Build an Arrow table with the selected columns of the rows matching the filter.
+    Numeric columns are handed over from the cached numpy arrays, and string
+    columns with few distinct values (like category) are dictionary-encoded.
+    """
+    pa = timed_import("pyarrow")
+    
+    available = get_columns()
+    columns = columns or available
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    
+    rows = select_rows(filter)
+    arrays = []
+    for column in columns:
+        values = get_column(column)[rows]
+        if values.dtype == float:
+            array = pa.array(values, from_pandas=True)
+        else:
+            # Other columns are exported as text: a column may hold numbers in one
+            # partition and strings in another, which Arrow can't infer a type for
+            array = pa.array([_as_text(v) for v in values], type=pa.string())
+        if pa.types.is_string(array.type) and len(array.unique()) <= len(array) // 2:
+            array = array.dictionary_encode()
+        arrays.append(array)
+    
+    return pa.table(arrays, names=columns)
+
+def serialize_table(table, format: str = "arrow") -> bytes:
+    """
+    Serialize an Arrow table as an Arrow IPC stream or a Parquet file
+    """
+    pa = timed_import("pyarrow")
+    sink = io.BytesIO()
+    
+    if format == "parquet":
+        pq = timed_import("pyarrow.parquet")
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    
+    return sink.getvalue()
@@ -0,0 +1,88 @@
+import hashlib
+import json
+from typing import Optional
+from fastapi import Request, Response
+from database import get_data_version, get_data_fingerprint
+from explain import EXPLAIN_HEADER, header_requests_explain, query_requests_explain
+
+# Conditional-request support for GET-based GraphQL queries.
+# Resolvers only read the in-memory dataset, so a query's result is fully
+# determined by the dataset it ran against and the operation itself. That
+# lets us hand out strong ETags and answer revalidations with 304 Not Modified
+# without executing the query again. A strong ETag identifies the exact bytes
+# sent, so gzip-compressed responses get their own tag with an encoding suffix.
+
+GRAPHQL_PATH = "/graphql"
+
+def operation_hash(query: str, variables: Optional[str] = None, operation_name: Optional[str] = None) -> str:
+    """
+    Hash of a GraphQL operation as sent in the query string
+    """
+    # Re-serialize the variables so that equivalent JSON hashes the same
+    if variables:
+        try:
+            variables = json.dumps(json.loads(variables), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            pass
+    
+    payload = "\0".join([query, variables or "", operation_name or ""])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def compute_etag(query: str, variables: Optional[str] = None, operation_name: Optional[str] = None) -> str:
+    """
+    Strong ETag derived from the dataset version and the operation hash
+    """
+    version = get_data_version()
+    dataset = f"{get_data_fingerprint()}:{version}"
+    digest = hashlib.sha256(f"{dataset}:{operation_hash(query, variables, operation_name)}".encode("utf-8")).hexdigest()
+    return f'"v{version}-{digest[:32]}"'
+
+def encoded_etag(etag: str, content_encoding: Optional[str]) -> str:
+    """
+    ETag of a response sent with the given content coding
+    """
+    if not content_encoding or content_encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{content_encoding}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+async def graphql_etag_middleware(request: Request, call_next):
+    """
+    Add ETags to GET GraphQL responses and answer matching revalidations with 304
+    """
+    query = request.query_params.get("query")
+    if request.method != "GET" or request.url.path.rstrip("/") != GRAPHQL_PATH or not query:
+        return await call_next(request)
+    
+    variables = request.query_params.get("variables")
+    operation_name = request.query_params.get("operationName")
+    
+    # Explain reports carry timings of this particular execution, so they are never cached
+    if header_requests_explain(request.headers.get(EXPLAIN_HEADER)) or query_requests_explain(query, operation_name):
+        return await call_next(request)
+    
+    etag = compute_etag(query, variables, operation_name)
+    
+    # The client may hold either the identity or the compressed representation
+    if_none_match = request.headers.get("if-none-match")
+    for tag in (etag, encoded_etag(etag, "gzip")):
+        if etag_matches(if_none_match, tag):
+            return Response(status_code=304, headers={"ETag": tag, "Cache-Control": "no-cache"})
+    
+    response = await call_next(request)
+    
+    # Only tag the response if the data didn't change while it was computed
+    if response.status_code == 200 and etag == compute_etag(query, variables, operation_name):
+        response.headers["ETag"] = encoded_etag(etag, response.headers.get("content-encoding"))
+        response.headers["Cache-Control"] = "no-cache"
+    
+    return response
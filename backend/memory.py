@@ -0,0 +1,55 @@
+import sys
+from typing import Any, Optional, Set
+
+# Helpers for estimating the memory held by the data layer. Sizes are shallow
+# sys.getsizeof values summed over every object reachable from a container,
+# counting each distinct object once, so interned strings and shared
+# records are only charged to the first structure that references them.
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate bytes held by an object and everything it references.
+    Objects already in `seen` are skipped, and the ones visited are added to it.
+    """
+    if seen is None:
+        seen = set()
+
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+
+        nbytes = getattr(current, "nbytes", None)
+        if isinstance(nbytes, int) and hasattr(current, "dtype"):
+            # numpy arrays: the buffer plus the array header
+            size += sys.getsizeof(current)
+            if current.dtype == object:
+                stack.extend(current.tolist())
+            continue
+
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(current, "__slots__"):
+            stack.extend(getattr(current, slot) for slot in current.__slots__ if hasattr(current, slot))
+        elif hasattr(current, "__dict__") and not isinstance(current, type):
+            stack.append(current.__dict__)
+
+    return size
+
+def format_bytes(size: int) -> str:
+    """
+    Human readable size, e.g. 1.5 MiB
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{size} B"
@@ -1,14 +1,30 @@
+import sys
 from dataclasses import dataclass
-from typing import Optional, List
+from enum import Enum
+from typing import Optional, List, Dict, Any, Set, Tuple
 import strawberry
+from strawberry.types import Info
 
 # Define Strawberry types for GraphQL schema
+@strawberry.type
+class ItemDetail:
+    item_id: str
+    description: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    extra_info: Optional[str] = None
+
 @strawberry.type
 class Item:
     id: str
     name: str
     value: float
     category: str
+    
+    @strawberry.field
+    async def details(self, info: Info) -> List[ItemDetail]:
+        """Related details of the item, loaded in one batch for all items of the request"""
+        return await info.context["detail_loader"].load(self.id)
 
 @strawberry.input
 class ItemInput:
@@ -16,19 +32,107 @@ class ItemInput:
     value: float
     category: str
 
+@strawberry.input
+class ItemFilter:
+    category: Optional[str] = None
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+
+@strawberry.type
+class HistogramBin:
+    lower: float
+    upper: float
+    count: int
+
+@strawberry.type
+class Histogram:
+    field: str
+    total: int
+    min: Optional[float]
+    max: Optional[float]
+    bins: List[HistogramBin]
+
+@strawberry.type
+class Quantile:
+    q: float
+    value: Optional[float]
+
+@strawberry.enum
+class ChangeOperation(Enum):
+    VERSION = "version"  # the dataset version moved without affecting the view
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+    RESET = "reset"  # the whole dataset was replaced; refetch the view
+
+@strawberry.type
+class ItemChange:
+    version: int
+    operation: ChangeOperation
+    id: Optional[str] = None
+    item: Optional[Item] = None
+
 # Define regular dataclasses for internal use
+def is_missing(value: Any) -> bool:
+    """Whether a value is a missing cell, which pandas reads as NaN"""
+    return isinstance(value, float) and value != value
+
+# Names of the extra columns of the records, shared by every record with the same columns
+_extra_column_sets: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
 @dataclass
 class ItemModel:
     """
-    Base data model class for items in the dataset
-    Will be extended based on the actual dataset columns
+    Compact in-memory record for an item of the dataset.
+    Uses __slots__ instead of a per-row dict, and category strings are interned
+    so every row of a category shares one string object. Columns of the dataset
+    beyond the schema fields are kept as a tuple of values, with their names in
+    `extra_columns`, a tuple shared by all records with the same columns.
+    Records are returned directly by the resolvers as GraphQL Items.
     """
+    __slots__ = ('id', 'name', 'value', 'category', 'extra_columns', 'extra_values')
+    
     id: str
     name: str
     value: float
     category: str
+    extra_columns: Tuple[str, ...]
+    extra_values: Tuple[Any, ...]
+    
+    FIELDS = ('id', 'name', 'value', 'category')
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ItemModel":
+        """Build a record from a row of the dataset"""
+        value = data.get('value')
+        extra_columns = tuple(key for key in data if key not in cls.FIELDS)
+        extra_columns = _extra_column_sets.setdefault(extra_columns, extra_columns)
+        return cls(
+            id=str(data.get('id', '')),
+            name=str(data.get('name', '')),
+            value=float(value) if value is not None else 0.0,
+            category=sys.intern(str(data.get('category', ''))),
+            extra_columns=extra_columns,
+            extra_values=tuple(None if is_missing(data[key]) else data[key] for key in extra_columns)
+        )
+    
+    def get(self, field: str, default: Any = None) -> Any:
+        """Value of a column, including the extra columns"""
+        if field in self.FIELDS:
+            return getattr(self, field)
+        try:
+            return self.extra_values[self.extra_columns.index(field)]
+        except ValueError:
+            return default
     
-    # Additional fields will be added based on the dataset structure
+    def columns(self) -> List[str]:
+        """Names of the columns of the record"""
+        return list(self.FIELDS) + list(self.extra_columns)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as a flat dictionary of columns, with missing values as None"""
+        values = {field: self.get(field) for field in self.columns()}
+        return {field: None if is_missing(value) else value for field, value in values.items()}
 
 @dataclass
 class PaginatedResponse:
@@ -42,4 +146,44 @@ class PaginatedResponse:
     
     @property
     def has_more(self) -> bool:
-        return self.total > (self.page * self.limit)
\ No newline at end of file
+        return self.total > (self.page * self.limit)
+
+@dataclass
+class DataChange:
+    """
+    A change to the in-memory dataset, published to subscribers
+    """
+    version: int
+    operation: ChangeOperation
+    id: Optional[str] = None
+    record: Optional[ItemModel] = None
+    previous: Optional[ItemModel] = None
+
+@dataclass
+class PartitionInfo:
+    """
+    A partition of the dataset: the range of rows it occupies in the merged
+    data and the metadata used to skip it when it cannot match a filter.
+    None for min_value/max_value/categories means unknown.
+    """
+    source: str
+    start: int
+    stop: int
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    categories: Optional[Set[str]] = None
+    
+    @property
+    def rows(self) -> int:
+        return self.stop - self.start
+    
+    def may_match(self, category: Optional[str] = None,
+                  min_value: Optional[float] = None, max_value: Optional[float] = None) -> bool:
+        """Whether any row of the partition can match the filter"""
+        if category and self.categories is not None and category not in self.categories:
+            return False
+        if min_value is not None and self.max_value is not None and self.max_value < min_value:
+            return False
+        if max_value is not None and self.min_value is not None and self.min_value > max_value:
+            return False
+        return True
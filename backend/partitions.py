@@ -0,0 +1,52 @@
+import glob
+import os
+from typing import List, Dict, Any
+
+# Helpers for datasets split into several CSV partitions (e.g. one file per
+# day or per category). read_partition runs in worker processes, so this
+# module deliberately avoids importing the rest of the backend.
+
+def resolve_partition_paths(path: str) -> List[str]:
+    """
+    Expand a dataset path into the list of partition files it refers to.
+    The path can be a single CSV file, a directory of CSV files or a glob pattern.
+    """
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '*.csv')))
+    if glob.has_magic(path):
+        return sorted(p for p in glob.glob(path) if os.path.isfile(p))
+    return [path] if os.path.exists(path) else []
+
+def summarize_partition(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Metadata used to skip a partition that cannot match a filter: the value
+    range and the set of categories. None means unknown, i.e. never skip.
+    """
+    values = [r['value'] for r in records
+              if isinstance(r.get('value'), (int, float)) and not isinstance(r.get('value'), bool) and r['value'] == r['value']]
+    # Categories are compared as strings, as stored in the records (ItemModel.from_dict)
+    categories = {str(r['category']) for r in records if 'category' in r}
+    has_category = all('category' in r for r in records)
+
+    return {
+        "rows": len(records),
+        "min_value": min(values) if values else None,
+        "max_value": max(values) if values else None,
+        "categories": categories if has_category else None,
+    }
+
+def read_partition(path: str) -> Dict[str, Any]:
+    """
+    Parse one partition file into records plus its metadata
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    records = df.to_dict(orient='records')
+
+    return {
+        "path": path,
+        "records": records,
+        "has_id": 'id' in df.columns,
+        **summarize_partition(records),
+    }
@@ -1,48 +1,335 @@
-from typing import List, Optional, Dict, Any
-from database import get_data_from_database
-from models import Item  # Import from models.py instead of schema.py
+from typing import List, Optional, Dict, Any, Tuple, AsyncGenerator, TYPE_CHECKING
+from database import (
+    get_data_from_database, get_data_version, get_column, get_columns, get_id_index, get_partitions, get_details_index,
+    insert_item, update_item, delete_item
+)
+from startup import timed_import
+from memory import deep_sizeof
+import explain
+from models import (  # Import from models.py instead of schema.py
+    ItemModel, ItemDetail, ItemInput, ItemChange, ChangeOperation, DataChange,
+    ItemFilter, Histogram, HistogramBin, Quantile, PartitionInfo, is_missing
+)
+import events
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # This file contains resolver functions for GraphQL queries
 # These functions will be responsible for fetching data from our "database"
 # (in this case, a CSV file loaded with pandas)
+# Item resolvers return the compact ItemModel records of the store directly;
+# Strawberry reads the Item fields from their attributes, so no per-response
+# Item objects are created.
 
-def map_dict_to_item(data_dict: Dict[str, Any]) -> Item:
+def map_dict_to_detail(data_dict: Dict[str, Any]) -> ItemDetail:
     """
-    Map a dictionary to an Item type
+    Map a dictionary to an ItemDetail type
     """
-    # Create an Item with only the fields that are in our schema
-    return Item(
-        id=str(data_dict.get('id', '')),
-        name=str(data_dict.get('name', '')),
-        value=float(data_dict.get('value', 0.0)),
-        category=str(data_dict.get('category', ''))
+    def optional_str(key: str) -> Optional[str]:
+        value = data_dict.get(key)
+        return str(value) if value is not None and not is_missing(value) else None
+    
+    return ItemDetail(
+        item_id=str(data_dict.get('item_id', '')),
+        description=optional_str('description'),
+        created_at=optional_str('created_at'),
+        updated_at=optional_str('updated_at'),
+        extra_info=optional_str('extra_info')
     )
 
-def get_items(limit: Optional[int] = 10, offset: Optional[int] = 0, category: Optional[str] = None) -> List[Item]:
+def get_item_detail_records(id: str) -> List[Dict[str, Any]]:
     """
-    Resolver for fetching multiple items with pagination and filtering
+    Fetch the raw detail records of a single item
+    """
+    return get_details_index().get(id, [])
+
+async def load_item_details(ids: List[str]) -> List[List[ItemDetail]]:
+    """
+    Batch loader for item details: resolves the details of every item requested
+    in the same tick with one pass over the grouped index, instead of one lookup per item
+    """
+    report = explain.start("item_details", batch_size=len(ids))
+    index = get_details_index()
+    
+    with explain.phase(report, "lookup"):
+        groups = [index.get(id, []) for id in ids]
+    with explain.phase(report, "map"):
+        details = [[map_dict_to_detail(detail) for detail in group] for group in groups]
+    
+    returned = sum(len(group) for group in details)
+    explain.note(report, access_path="index:item_id", rows_examined=returned,
+                 rows_returned=returned, objects_created=returned)
+    return details
+
+def matching_partitions(category: Optional[str] = None, min_value: Optional[float] = None,
+                        max_value: Optional[float] = None) -> List[PartitionInfo]:
+    """
+    Partitions that may contain rows matching the filter; the others can be skipped entirely
+    """
+    return [p for p in get_partitions() if p.may_match(category, min_value, max_value)]
+
+def _scan_access_path(partitions: List[PartitionInfo]) -> Dict[str, Any]:
+    """
+    Explain details for a scan over the given partitions
+    """
+    skipped = len(get_partitions()) - len(partitions)
+    return {
+        "access_path": "partition_scan" if skipped else "full_scan",
+        "partitions_scanned": len(partitions),
+        "partitions_skipped": skipped,
+        "rows_examined": sum(p.rows for p in partitions),
+    }
+
+def get_item_records(limit: Optional[int] = 10, offset: Optional[int] = 0, category: Optional[str] = None,
+                     report: Optional[Dict[str, Any]] = None) -> Tuple[List[ItemModel], int]:
+    """
+    Fetch a page of raw records along with the total number of matching records.
+    Shared by the GraphQL resolvers and the REST endpoints so both read the same data.
     """
     data = get_data_from_database()
     
-    # Apply category filter if provided
+    # Apply category filter if provided, only scanning partitions that can contain the category
     if category:
-        data = [item for item in data if item.get('category') == category]
+        with explain.phase(report, "filter"):
+            partitions = matching_partitions(category)
+            data = [
+                item
+                for partition in partitions
+                for item in data[partition.start:partition.stop]
+                if item.category == category
+            ]
+        explain.note(report, **_scan_access_path(partitions))
     
     # Apply pagination
-    paginated_data = data[offset:offset + limit]
+    with explain.phase(report, "paginate"):
+        page = data[offset:offset + limit]
+    if not category:
+        explain.note(report, access_path="slice", rows_examined=len(page))
+    explain.note(report, rows_matched=len(data), rows_returned=len(page))
     
-    # Map the data to Item types
-    return [map_dict_to_item(item) for item in paginated_data]
+    return page, len(data)
 
-def get_item_by_id(id: str) -> Optional[Item]:
+def get_item_record_by_id(id: str) -> Optional[ItemModel]:
     """
-    Resolver for fetching a single item by ID
+    Fetch a single raw record by ID
     """
     data = get_data_from_database()
     
-    # Find the item with the matching ID
-    for item in data:
-        if str(item.get('id', '')) == id:
-            return map_dict_to_item(item)
+    # Look the item up in the ID index
+    index = get_id_index().get(id)
+    record = data[index] if index is not None else None
+    explain.note(explain.start("item", id=id), access_path="index:id",
+                 rows_examined=int(record is not None), rows_returned=int(record is not None))
+    return record
+
+def get_items(limit: Optional[int] = 10, offset: Optional[int] = 0, category: Optional[str] = None) -> List[ItemModel]:
+    """
+    Resolver for fetching multiple items with pagination and filtering
+    """
+    report = explain.start("items", limit=limit, offset=offset, category=category)
+    paginated_data, _ = get_item_records(limit, offset, category, report)
+    
+    # The records are served as Items as they are
+    explain.note(report, objects_created=0)
+    return paginated_data
+
+def get_item_by_id(id: str) -> Optional[ItemModel]:
+    """
+    Resolver for fetching a single item by ID
+    """
+    return get_item_record_by_id(id)
+
+# Cache for summaries computed over whole columns, keyed by dataset version
+# so that any change to the data invalidates it
+_summary_cache: Dict[Tuple, Any] = {}
+MAX_SUMMARY_CACHE_SIZE = 256
+MAX_HISTOGRAM_BINS = 1000
+
+def _cached_summary(key: Tuple, compute, report: Optional[Dict[str, Any]] = None):
+    key = (get_data_version(),) + key
+    explain.note(report, cache_hit=key in _summary_cache)
+    if key not in _summary_cache:
+        # Drop entries computed for older versions, or everything if the cache is full
+        for stale in [k for k in _summary_cache if k[0] != key[0]]:
+            del _summary_cache[stale]
+        if len(_summary_cache) >= MAX_SUMMARY_CACHE_SIZE:
+            _summary_cache.clear()
+        _summary_cache[key] = compute()
+    return _summary_cache[key]
+
+def _filter_key(filter: Optional[ItemFilter]) -> Tuple:
+    if filter is None:
+        return (None, None, None)
+    return (filter.category, filter.min_value, filter.max_value)
+
+def summary_cache_report(seen: Optional[set] = None) -> Dict[str, Any]:
+    """
+    Number of cached summaries and the approximate bytes they hold
+    """
+    return {
+        "entries": len(_summary_cache),
+        "max_entries": MAX_SUMMARY_CACHE_SIZE,
+        "bytes": deep_sizeof(_summary_cache, seen),
+    }
+
+def select_rows(filter: Optional[ItemFilter], report: Optional[Dict[str, Any]] = None):
+    """
+    Positions of the rows matching the filter, for indexing the columns returned by get_column.
+    Returns a slice selecting every row when there is no filter.
+    """
+    np = timed_import("numpy")
+    rows_total = len(get_data_from_database())
+    
+    if filter is None:
+        explain.note(report, access_path="column", rows_examined=rows_total)
+        return slice(None)
     
-    return None
\ No newline at end of file
+    # Only look at the rows of partitions that can match the filter
+    partitions = matching_partitions(filter.category, filter.min_value, filter.max_value)
+    explain.note(report, **_scan_access_path(partitions))
+    if len(partitions) < len(get_partitions()):
+        rows = np.concatenate([np.arange(p.start, p.stop) for p in partitions] + [np.array([], dtype=int)])
+    else:
+        rows = np.arange(rows_total)
+    
+    mask = np.ones(len(rows), dtype=bool)
+    if filter.category:
+        mask &= get_column('category')[rows] == filter.category
+    if filter.min_value is not None:
+        mask &= get_column('value')[rows] >= filter.min_value
+    if filter.max_value is not None:
+        mask &= get_column('value')[rows] <= filter.max_value
+    
+    return rows[mask]
+
+def _numeric_values(field: str, filter: Optional[ItemFilter], report: Optional[Dict[str, Any]] = None) -> "np.ndarray":
+    """
+    Values of a numeric column for the rows matching the filter, without missing values
+    """
+    np = timed_import("numpy")
+    if field not in get_columns():
+        raise ValueError(f"Unknown field: {field}")
+    values = get_column(field)
+    if values.dtype != float:
+        raise ValueError(f"Field {field} is not numeric")
+    
+    values = values[select_rows(filter, report)]
+    return values[~np.isnan(values)]
+
+def get_histogram(field: str = "value", bins: int = 10, filter: Optional[ItemFilter] = None) -> Histogram:
+    """
+    Resolver for the distribution of a numeric field, binned on the server
+    """
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        raise ValueError(f"bins must be between 1 and {MAX_HISTOGRAM_BINS}")
+    
+    report = explain.start("histogram", field=field, bins=bins)
+    
+    def compute() -> Histogram:
+        np = timed_import("numpy")
+        with explain.phase(report, "filter"):
+            values = _numeric_values(field, filter, report)
+        if len(values) == 0:
+            return Histogram(field=field, total=0, min=None, max=None, bins=[])
+        
+        with explain.phase(report, "bin"):
+            counts, edges = np.histogram(values, bins=bins)
+        return Histogram(
+            field=field,
+            total=int(len(values)),
+            min=float(values.min()),
+            max=float(values.max()),
+            bins=[
+                HistogramBin(lower=float(edges[i]), upper=float(edges[i + 1]), count=int(counts[i]))
+                for i in range(len(counts))
+            ]
+        )
+    
+    return _cached_summary(("histogram", field, bins) + _filter_key(filter), compute, report)
+
+def get_quantiles(field: str = "value", qs: Optional[List[float]] = None, filter: Optional[ItemFilter] = None) -> List[Quantile]:
+    """
+    Resolver for quantiles of a numeric field
+    """
+    qs = qs if qs is not None else [0.25, 0.5, 0.75]
+    if any(not 0 <= q <= 1 for q in qs):
+        raise ValueError("Quantiles must be between 0 and 1")
+    
+    report = explain.start("quantiles", field=field, qs=qs)
+    
+    def compute() -> List[Quantile]:
+        np = timed_import("numpy")
+        with explain.phase(report, "filter"):
+            values = _numeric_values(field, filter, report)
+        if len(values) == 0:
+            return [Quantile(q=q, value=None) for q in qs]
+        
+        with explain.phase(report, "quantiles"):
+            results = np.quantile(values, qs)
+        return [Quantile(q=q, value=float(v)) for q, v in zip(qs, results)]
+    
+    return _cached_summary(("quantiles", field, tuple(qs)) + _filter_key(filter), compute, report)
+
+def create_item(item: ItemInput) -> ItemModel:
+    """
+    Resolver for adding a new item
+    """
+    return insert_item({"name": item.name, "value": item.value, "category": item.category})
+
+def modify_item(id: str, item: ItemInput) -> Optional[ItemModel]:
+    """
+    Resolver for updating an existing item
+    """
+    return update_item(id, {"name": item.name, "value": item.value, "category": item.category})
+
+def remove_item(id: str) -> bool:
+    """
+    Resolver for deleting an item
+    """
+    return delete_item(id)
+
+def _in_view(record: Optional[ItemModel], category: Optional[str]) -> bool:
+    return record is not None and (not category or record.category == category)
+
+def to_view_change(change: DataChange, category: Optional[str] = None) -> ItemChange:
+    """
+    Translate a dataset change into the change seen by a view filtered by category.
+    Updates that move an item into or out of the view become inserts or deletes,
+    and changes outside the view only report the new version.
+    """
+    was_in_view = _in_view(change.previous, category)
+    is_in_view = _in_view(change.record, category)
+    
+    if change.operation == ChangeOperation.RESET:
+        operation = ChangeOperation.RESET
+    elif was_in_view and is_in_view:
+        operation = ChangeOperation.UPDATE
+    elif is_in_view:
+        operation = ChangeOperation.INSERT
+    elif was_in_view:
+        operation = ChangeOperation.DELETE
+    else:
+        return ItemChange(version=change.version, operation=ChangeOperation.VERSION)
+    
+    record = change.record if is_in_view else change.previous
+    return ItemChange(
+        version=change.version,
+        operation=operation,
+        id=change.id,
+        item=record
+    )
+
+async def watch_item_changes(category: Optional[str] = None) -> AsyncGenerator[ItemChange, None]:
+    """
+    Resolver for the item changes subscription.
+    Starts with the current dataset version, then pushes a delta for every change.
+    """
+    queue = events.subscribe()
+    try:
+        yield ItemChange(version=get_data_version(), operation=ChangeOperation.VERSION)
+        while True:
+            change = await queue.get()
+            yield to_view_change(change, category)
+    finally:
+        events.unsubscribe(queue)
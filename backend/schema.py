@@ -1,9 +1,15 @@
 import strawberry
-from typing import List, Optional
-from models import Item
+from typing import List, Optional, AsyncGenerator
+from explain import ExplainExtension, explain
+from models import Item, ItemInput, ItemChange, ItemFilter, Histogram, Quantile
 
 # Import resolvers - moved down to avoid circular imports
-from resolvers import get_items, get_item_by_id
+from resolvers import (
+    get_items, get_item_by_id,
+    get_histogram, get_quantiles,
+    create_item, modify_item, remove_item,
+    watch_item_changes
+)
 
 @strawberry.type
 class Query:
@@ -21,6 +27,61 @@ class Query:
     def item(self, id: str) -> Optional[Item]:
         """Get a single item by ID"""
         return get_item_by_id(id)
+    
+    @strawberry.field
+    def histogram(
+        self,
+        field: str = "value",
+        bins: int = 10,
+        filter: Optional[ItemFilter] = None
+    ) -> Histogram:
+        """Get the distribution of a numeric field, binned on the server"""
+        return get_histogram(field, bins, filter)
+    
+    @strawberry.field
+    def quantiles(
+        self,
+        field: str = "value",
+        qs: Optional[List[float]] = None,
+        filter: Optional[ItemFilter] = None
+    ) -> List[Quantile]:
+        """Get quantiles (between 0 and 1) of a numeric field"""
+        return get_quantiles(field, qs, filter)
+
+@strawberry.type
+class Mutation:
+    @strawberry.mutation
+    def create_item(self, item: ItemInput) -> Item:
+        """Add a new item"""
+        return create_item(item)
+    
+    @strawberry.mutation
+    def update_item(self, id: str, item: ItemInput) -> Optional[Item]:
+        """Update an existing item"""
+        return modify_item(id, item)
+    
+    @strawberry.mutation
+    def delete_item(self, id: str) -> bool:
+        """Delete an item"""
+        return remove_item(id)
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def item_changes(self, category: Optional[str] = None) -> AsyncGenerator[ItemChange, None]:
+        """
+        Push dataset changes for a view of items, optionally filtered by category.
+        The first message carries the current version; later messages are row-level
+        deltas, or a RESET when the view has to be refetched.
+        """
+        async for change in watch_item_changes(category):
+            yield change
 
 # Create the schema
-schema = strawberry.Schema(query=Query)
\ No newline at end of file
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    directives=[explain],
+    extensions=[ExplainExtension]
+)
\ No newline at end of file
@@ -0,0 +1,154 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Startup pipeline: heavy modules are imported lazily through timed_import,
+# and the data is loaded, indexed and the schema warmed up before the app
+# reports itself ready. Progress and timings are exposed through readiness().
+
+# Log a breakdown of startup time once the app is ready
+PROFILE_STARTUP = os.environ.get("STARTUP_PROFILE", "0") == "1"
+
+# Retry-After sent to requests that arrive before the app is ready
+READY_RETRY_AFTER_S = int(os.environ.get("READY_RETRY_AFTER_S", "1"))
+
+# Time spent importing modules through timed_import, in ms
+_import_times: Dict[str, float] = {}
+
+_state: Dict[str, Any] = {
+    "status": "starting",
+    "phase": None,
+    "completed": [],
+    "timings": {},
+    "error": None,
+}
+_phases: List[str] = []
+
+def timed_import(name: str):
+    """
+    Import a module on first use, recording how long the import took
+    """
+    if name in sys.modules:
+        # Still go through the import system: if another thread is in the middle
+        # of importing the module, this waits for it to finish initializing
+        return importlib.import_module(name)
+    start_time = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times[name] = round((time.perf_counter() - start_time) * 1000, 2)
+    return module
+
+def is_ready() -> bool:
+    """
+    Whether the startup pipeline has completed
+    """
+    return _state["status"] == "ready"
+
+def readiness() -> Dict[str, Any]:
+    """
+    Current status and progress of the startup pipeline
+    """
+    total = len(_phases)
+    return {
+        "status": _state["status"],
+        "phase": _state["phase"],
+        "progress": round(len(_state["completed"]) / total, 2) if total else 0.0,
+        "completed": list(_state["completed"]),
+        "timings_ms": dict(_state["timings"]),
+        "imports_ms": dict(_import_times),
+        "error": _state["error"],
+    }
+
+class ReadinessMiddleware:
+    """
+    ASGI middleware answering requests to a path with 503 until the startup
+    pipeline has completed. Resolvers read the data synchronously, so letting
+    them run during warm-up would block the event loop on the load in
+    progress, stalling /health and /ready along with them.
+    """
+    def __init__(self, app, path: str = "/graphql"):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if is_ready() or scope["type"] not in ("http", "websocket") or scope["path"].rstrip("/") != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["type"] == "websocket":
+            # 1013: try again later
+            await send({"type": "websocket.close", "code": 1013})
+            return
+
+        content = json.dumps({"errors": [{"message": "Server is starting up, please retry later"}]}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(content)).encode("latin-1")),
+                (b"retry-after", str(READY_RETRY_AFTER_S).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
+
+def run_startup_pipeline(phases: List[Tuple[str, Callable[[], Any]]]):
+    """
+    Run the startup phases in order, tracking progress and timings.
+    Meant to run in a worker thread so the server can answer health checks meanwhile.
+    """
+    _phases[:] = [name for name, _ in phases]
+    _state.update(status="loading", completed=[], timings={}, error=None)
+
+    for name, phase in phases:
+        _state["phase"] = name
+        start_time = time.perf_counter()
+        try:
+            phase()
+        except Exception as e:
+            print(f"Startup failed during {name}: {e}")
+            _state.update(status="failed", error=f"{name}: {e}")
+            return
+        _state["timings"][name] = round((time.perf_counter() - start_time) * 1000, 2)
+        _state["completed"].append(name)
+
+    _state.update(status="ready", phase=None)
+    if PROFILE_STARTUP:
+        print_startup_profile()
+
+def print_startup_profile():
+    """
+    Print where startup time went: each pipeline phase and each deferred import
+    """
+    print("Startup phases:")
+    for name, duration in _state["timings"].items():
+        print(f"  {name:<20} {duration:>10.2f} ms")
+    print("Deferred imports:")
+    for name, duration in sorted(_import_times.items(), key=lambda item: -item[1]):
+        print(f"  {name:<20} {duration:>10.2f} ms")
+
+def profile_imports(module: str = "app", top: Optional[int] = 20) -> List[Tuple[str, float]]:
+    """
+    Import a module in a fresh interpreter with -X importtime and return the
+    slowest imports as (module, cumulative ms), slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(cumulative) / 1000))
+
+    timings.sort(key=lambda item: -item[1])
+    return timings[:top]
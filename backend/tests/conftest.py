@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The backend modules import each other as top-level modules (they are run
+# from the backend directory), so make them importable from the tests too
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,178 @@
+import asyncio
+import json
+
+from admission import (
+    AdmissionController, classify, _request_priority,
+    PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW,
+)
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+async def _settle():
+    # Let waiting tasks run up to their next suspension point
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_admits_up_to_max_concurrent_without_queueing():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=2, max_queued=4, queue_timeout=1)
+        assert await controller.acquire()
+        assert await controller.acquire()
+        assert controller.active == 2
+        assert controller.counters["queued"] == 0
+    run(scenario())
+
+def test_release_hands_slot_to_most_important_waiter():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=4, queue_timeout=1)
+        await controller.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            assert await controller.acquire(priority)
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter("scan", PRIORITY_LOW)),
+                 asyncio.create_task(waiter("page", PRIORITY_NORMAL)),
+                 asyncio.create_task(waiter("lookup", PRIORITY_HIGH))]
+        await _settle()
+        assert controller.stats()["queue_depth"] == 3
+
+        for _ in range(3):
+            controller.release()
+            await _settle()
+        await asyncio.gather(*tasks)
+
+        assert order == ["lookup", "page", "scan"]
+        assert controller.active == 1
+    run(scenario())
+
+def test_full_queue_sheds_less_important_waiter():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=1, queue_timeout=1)
+        await controller.acquire()
+        scan = asyncio.create_task(controller.acquire(PRIORITY_LOW))
+        await _settle()
+
+        lookup = asyncio.create_task(controller.acquire(PRIORITY_HIGH))
+        await _settle()
+
+        assert await scan is False
+        assert controller.counters["shed"] == 1
+        controller.release()
+        assert await lookup is True
+    run(scenario())
+
+def test_full_queue_rejects_newcomer_that_is_not_more_important():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=1, queue_timeout=1)
+        await controller.acquire()
+        queued = asyncio.create_task(controller.acquire(PRIORITY_NORMAL))
+        await _settle()
+
+        assert await controller.acquire(PRIORITY_NORMAL) is False
+        assert controller.counters["rejected"] == 1
+
+        controller.release()
+        assert await queued is True
+    run(scenario())
+
+def test_waiter_times_out_and_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=4, queue_timeout=0.01)
+        await controller.acquire()
+        assert await controller.acquire() is False
+        assert controller.counters["timed_out"] == 1
+        assert controller.stats()["queue_depth"] == 0
+
+        controller.release()
+        assert controller.active == 0
+    run(scenario())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=4, queue_timeout=1)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await _settle()
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert controller.stats()["queue_depth"] == 0
+
+        controller.release()
+        assert controller.active == 0
+    run(scenario())
+
+def test_slot_handed_to_cancelled_waiter_is_not_lost():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=4, queue_timeout=1)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await _settle()
+
+        # The slot is handed over, then the client goes away before resuming
+        controller.release()
+        waiter.cancel()
+        result, = await asyncio.gather(waiter, return_exceptions=True)
+        if result is True:
+            controller.release()
+
+        assert controller.active == 0
+        assert await controller.acquire() is True
+    run(scenario())
+
+def test_classify():
+    assert classify('{ item(id: "1") { id } }') == PRIORITY_HIGH
+    assert classify('{ histogram { total } quantiles { value } }') == PRIORITY_HIGH
+    assert classify('{ items(limit: 10) { id } }') == PRIORITY_NORMAL
+    assert classify('{ items { id } }') == PRIORITY_NORMAL
+    assert classify('{ items(limit: 5000) { id } }') == PRIORITY_LOW
+    assert classify('{ item(id: "1") { id } items(limit: 5000) { id } }') == PRIORITY_LOW
+    assert classify('query Q($n: Int) { items(limit: $n) { id } }', {"n": 10}) == PRIORITY_NORMAL
+    assert classify('query Q($n: Int) { items(limit: $n) { id } }', {"n": 5000}) == PRIORITY_LOW
+    assert classify('mutation { deleteItem(id: "1") }') == PRIORITY_NORMAL
+    assert classify('{ not valid') == PRIORITY_NORMAL
+    assert classify(None) == PRIORITY_NORMAL
+
+def _post_scope(priority=None):
+    headers = [(b"content-type", b"application/json")]
+    if priority is not None:
+        headers.append((b"x-priority", priority))
+    return {"method": "POST", "headers": headers}
+
+def test_priority_header_can_only_lower_priority():
+    scan = json.dumps({"query": "{ items(limit: 5000) { id } }"}).encode()
+    lookup = json.dumps({"query": '{ item(id: "1") { id } }'}).encode()
+
+    assert _request_priority(_post_scope(b"high"), scan) == PRIORITY_LOW
+    assert _request_priority(_post_scope(b"low"), lookup) == PRIORITY_LOW
+    assert _request_priority(_post_scope(b"bogus"), lookup) == PRIORITY_HIGH
+    assert _request_priority(_post_scope(), lookup) == PRIORITY_HIGH
+
+def test_get_request_priority_uses_query_string():
+    scope = {"method": "GET", "headers": [], "query_string": b"query=%7B%20items(limit%3A%205000)%20%7B%20id%20%7D%20%7D"}
+    assert _request_priority(scope, b"") == PRIORITY_LOW
+
+def test_full_queue_skips_waiter_that_is_already_leaving():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=1, queue_timeout=1)
+        await controller.acquire()
+        scan = asyncio.create_task(controller.acquire(PRIORITY_LOW))
+        await _settle()
+
+        # The waiter's future is cancelled but it hasn't left the queue yet
+        scan.cancel()
+        await asyncio.sleep(0)
+
+        lookup = asyncio.create_task(controller.acquire(PRIORITY_HIGH))
+        await asyncio.gather(scan, return_exceptions=True)
+        await _settle()
+        assert controller.counters["shed"] == 0
+        assert controller.counters["rejected"] == 0
+
+        controller.release()
+        assert await lookup is True
+        assert controller.stats()["queue_depth"] == 0
+    run(scenario())
@@ -0,0 +1,22 @@
+import database
+from resolvers import map_dict_to_detail
+
+def test_blank_detail_cells_are_read_as_none(tmp_path, monkeypatch):
+    path = tmp_path / "details.csv"
+    path.write_text("item_id,description,created_at,updated_at,extra_info\n"
+                    "1,first,2023,,\n"
+                    "1,,2024,,note\n")
+    monkeypatch.setattr(database, "DETAILS_PATH", str(path))
+
+    assert database._load_details() == [
+        {"item_id": "1", "description": "first", "created_at": "2023", "updated_at": None, "extra_info": None},
+        {"item_id": "1", "description": None, "created_at": "2024", "updated_at": None, "extra_info": "note"},
+    ]
+
+def test_map_dict_to_detail_treats_nan_as_missing():
+    detail = map_dict_to_detail({"item_id": 1, "description": float("nan"), "created_at": 2023})
+
+    assert detail.item_id == "1"
+    assert detail.description is None
+    assert detail.created_at == "2023"
+    assert detail.updated_at is None
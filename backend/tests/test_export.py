@@ -0,0 +1,30 @@
+import pytest
+
+import database
+from export import export_table
+
+@pytest.fixture
+def mixed_partitions(tmp_path, monkeypatch):
+    # "code" is numeric in one partition and text in the other, "extra" only exists in the second
+    (tmp_path / "p1.csv").write_text("id,name,value,category,code\n1,a,1.0,A,5\n2,b,2.0,B,\n")
+    (tmp_path / "p2.csv").write_text("id,name,value,category,code,extra\n3,c,3.0,A,x,e1\n4,d,4.0,B,y,\n")
+    monkeypatch.setattr(database, "DATASET_PATH", str(tmp_path))
+    monkeypatch.setattr(database, "DATASET_LOAD_WORKERS", 1)
+    monkeypatch.setattr(database, "_data_cache", None)
+
+def test_columns_are_the_union_over_partitions(mixed_partitions):
+    assert database.get_columns() == ["id", "name", "value", "category", "code", "extra"]
+
+def test_export_mixed_columns_as_text(mixed_partitions):
+    pytest.importorskip("pyarrow")
+    table = export_table()
+
+    assert table.column_names == ["id", "name", "value", "category", "code", "extra"]
+    assert table.column("code").to_pylist() == ["5", None, "x", "y"]
+    assert table.column("extra").to_pylist() == [None, None, "e1", None]
+    assert table.column("value").to_pylist() == [1.0, 2.0, 3.0, 4.0]
+
+def test_export_rejects_unknown_columns(mixed_partitions):
+    pytest.importorskip("pyarrow")
+    with pytest.raises(ValueError, match="Unknown columns: nope"):
+        export_table(["code", "nope"])
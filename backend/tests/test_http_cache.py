@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+
+import http_cache
+from http_cache import encoded_etag, etag_matches, graphql_etag_middleware
+
+QUERY = "{ items { id } }"
+
+@pytest.fixture
+def state(monkeypatch):
+    state = {"version": 1, "bump_during_request": False}
+    monkeypatch.setattr(http_cache, "get_data_version", lambda: state["version"])
+    monkeypatch.setattr(http_cache, "get_data_fingerprint", lambda: "test")
+    return state
+
+@pytest.fixture
+def client(state):
+    # Same middleware order as the app: the ETag middleware wraps gzip
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=100)
+    app.middleware("http")(graphql_etag_middleware)
+
+    @app.get("/graphql")
+    def graphql(query: str):
+        if state["bump_during_request"]:
+            state["version"] += 1
+        return {"data": {"items": [{"id": str(i)} for i in range(50)]}}
+
+    return TestClient(app)
+
+def _get(client, query=QUERY, encoding="gzip", **headers):
+    return client.get("/graphql", params={"query": query}, headers={"Accept-Encoding": encoding, **headers})
+
+def test_encoded_etag():
+    assert encoded_etag('"v1-abc"', "gzip") == '"v1-abc-gzip"'
+    assert encoded_etag('"v1-abc"', None) == '"v1-abc"'
+    assert encoded_etag('"v1-abc"', "identity") == '"v1-abc"'
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+def test_identity_and_gzip_responses_get_distinct_tags(client):
+    identity = _get(client, encoding="identity")
+    compressed = _get(client)
+
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == encoded_etag(identity.headers["etag"], "gzip")
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_revalidation_with_either_tag_returns_304(client, encoding):
+    etag = _get(client, encoding=encoding).headers["etag"]
+    response = _get(client, encoding=encoding, **{"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+def test_stale_tag_gets_a_full_response(client, state):
+    etag = _get(client).headers["etag"]
+    state["version"] += 1
+    response = _get(client, **{"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+def test_no_etag_when_data_changes_during_the_request(client, state):
+    state["bump_during_request"] = True
+    response = _get(client)
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+def test_no_etag_for_explain_requests(client):
+    assert "etag" not in _get(client, query="query @explain { items { id } }").headers
+    assert "etag" not in _get(client, **{"X-Explain": "1"}).headers
+    # Values that don't turn explain mode on don't disable caching either
+    assert "etag" in _get(client, **{"X-Explain": "0"}).headers
+
+def test_post_requests_are_not_tagged(client):
+    response = client.post("/graphql", params={"query": QUERY})
+
+    assert "etag" not in response.headers
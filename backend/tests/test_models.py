@@ -0,0 +1,38 @@
+import sys
+
+from models import ItemModel
+
+def test_extra_columns_are_shared_between_records():
+    first = ItemModel.from_dict({"id": 1, "name": "a", "value": 1.5, "category": "A", "note": "x"})
+    second = ItemModel.from_dict({"id": 2, "name": "b", "value": 2.5, "category": "A", "note": "y"})
+
+    assert first.extra_columns is second.extra_columns
+    assert first.category is second.category
+    assert not hasattr(first, "__dict__")
+
+def test_records_without_extra_columns_hold_empty_tuples():
+    record = ItemModel.from_dict({"id": "1", "name": "a", "value": 1.5, "category": "A"})
+
+    assert record.extra_columns == () and record.extra_values == ()
+    assert record.columns() == ["id", "name", "value", "category"]
+    assert record.get("note", "default") == "default"
+
+def test_values_are_coerced_and_missing_cells_become_none():
+    record = ItemModel.from_dict({"id": 7, "name": "a", "value": "2", "category": "B",
+                                  "note": float("nan"), "size": 3})
+
+    assert (record.id, record.value) == ("7", 2.0)
+    assert record.get("note") is None
+    assert record.get("size") == 3
+    assert record.to_dict() == {"id": "7", "name": "a", "value": 2.0, "category": "B", "note": None, "size": 3}
+
+def test_to_dict_maps_missing_value_to_none():
+    record = ItemModel.from_dict({"id": "1", "name": "a", "value": float("nan"), "category": "A"})
+
+    assert record.to_dict()["value"] is None
+
+def test_record_is_smaller_than_the_row_dict():
+    row = {"id": "1", "name": "a", "value": 1.5, "category": "A", "note": "x"}
+    record = ItemModel.from_dict(row)
+
+    assert sys.getsizeof(record) + sys.getsizeof(record.extra_values) < sys.getsizeof(row)
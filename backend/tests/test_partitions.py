@@ -0,0 +1,96 @@
+import database
+from models import ChangeOperation, ItemModel, PartitionInfo
+from partitions import summarize_partition
+
+def _record(id, value, category):
+    return ItemModel.from_dict({"id": id, "name": f"Item {id}", "value": value, "category": category})
+
+def _two_partitions(monkeypatch):
+    partitions = [
+        PartitionInfo(source="a.csv", start=0, stop=3, min_value=1.0, max_value=5.0, categories={"A"}),
+        PartitionInfo(source="b.csv", start=3, stop=5, min_value=10.0, max_value=20.0, categories={"B"}),
+    ]
+    monkeypatch.setattr(database, "_partitions", partitions)
+    return partitions
+
+def test_insert_appends_to_last_partition_and_widens_it(monkeypatch):
+    first, _ = _two_partitions(monkeypatch)
+    adjusted = database._adjust_partitions(ChangeOperation.INSERT, 5, _record("6", 50.0, "C"))
+
+    assert adjusted[0] == first
+    assert (adjusted[1].start, adjusted[1].stop) == (3, 6)
+    assert (adjusted[1].min_value, adjusted[1].max_value) == (10.0, 50.0)
+    assert adjusted[1].categories == {"B", "C"}
+    assert adjusted[1].may_match(category="C", min_value=45.0)
+
+def test_update_widens_only_the_containing_partition(monkeypatch):
+    _, second = _two_partitions(monkeypatch)
+    adjusted = database._adjust_partitions(ChangeOperation.UPDATE, 1, _record("2", -3.0, "B"))
+
+    assert (adjusted[0].start, adjusted[0].stop) == (0, 3)
+    assert (adjusted[0].min_value, adjusted[0].max_value) == (-3.0, 5.0)
+    assert adjusted[0].categories == {"A", "B"}
+    assert adjusted[1] == second
+
+def test_delete_shrinks_containing_partition_and_shifts_later_ones(monkeypatch):
+    _two_partitions(monkeypatch)
+    adjusted = database._adjust_partitions(ChangeOperation.DELETE, 1, None)
+
+    assert [(p.start, p.stop) for p in adjusted] == [(0, 2), (2, 4)]
+    # Metadata is never narrowed, only ranges move
+    assert (adjusted[0].min_value, adjusted[0].max_value) == (1.0, 5.0)
+
+def test_delete_of_last_row_of_a_partition(monkeypatch):
+    _two_partitions(monkeypatch)
+    adjusted = database._adjust_partitions(ChangeOperation.DELETE, 2, None)
+
+    assert [(p.start, p.stop) for p in adjusted] == [(0, 2), (2, 4)]
+
+def test_writes_without_partitions_start_one(monkeypatch):
+    monkeypatch.setattr(database, "_partitions", [])
+    adjusted = database._adjust_partitions(ChangeOperation.INSERT, 0, _record("1", 2.0, "A"))
+
+    assert len(adjusted) == 1
+    assert (adjusted[0].source, adjusted[0].start, adjusted[0].stop) == ("writes", 0, 1)
+    # The value range is learned from the row, unknown categories stay unknown
+    assert (adjusted[0].min_value, adjusted[0].max_value) == (2.0, 2.0)
+    assert adjusted[0].categories is None
+    assert adjusted[0].may_match(category="Z")
+    assert not adjusted[0].may_match(min_value=100.0)
+
+def test_adjustment_does_not_modify_the_published_partitions(monkeypatch):
+    partitions = _two_partitions(monkeypatch)
+    before = list(partitions)
+    database._adjust_partitions(ChangeOperation.INSERT, 5, _record("6", 50.0, "C"))
+
+    assert partitions == before
+    assert partitions[1].categories == {"B"}
+
+def test_may_match_prunes_on_category_and_value_range():
+    partition = PartitionInfo(source="a.csv", start=0, stop=3, min_value=1.0, max_value=5.0, categories={"A"})
+
+    assert partition.may_match(category="A", min_value=4.0, max_value=9.0)
+    assert not partition.may_match(category="B")
+    assert not partition.may_match(min_value=6.0)
+    assert not partition.may_match(max_value=0.5)
+
+def test_summarize_partition_ignores_missing_values():
+    summary = summarize_partition([
+        {"value": 2.0, "category": "A"},
+        {"value": float("nan"), "category": "B"},
+        {"value": 7.5, "category": "A"},
+    ])
+
+    assert (summary["rows"], summary["min_value"], summary["max_value"]) == (3, 2.0, 7.5)
+    assert summary["categories"] == {"A", "B"}
+
+def test_summarize_partition_stores_categories_as_strings():
+    records = [{"value": 1.0, "category": 1}, {"value": 2.0, "category": 2}]
+    summary = summarize_partition(records)
+    partition = PartitionInfo(source="a.csv", start=0, stop=2, categories=summary["categories"])
+
+    assert summary["categories"] == {"1", "2"}
+    # Records report the category as a string, so filters use strings too
+    assert ItemModel.from_dict(records[0]).category == "1"
+    assert partition.may_match(category="1")
+    assert not partition.may_match(category="3")
@@ -1,9 +1,10 @@
 import streamlit as st
-from graphql_client import run_query
+from graphql_client import run_query, run_cached_query
 import pandas as pd
 import plotly.express as px
 import sys
 import os
+from downsample import lttb, minmax_downsample
 
 # Add the parent directory to the path to import from pages
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -32,6 +33,33 @@ page = st.sidebar.radio("Go to", ["Home", "GraphQL Explorer", "REST Comparison",
 # GraphQL configuration
 GRAPHQL_URL = "http://localhost:8000/graphql"
 
+# Charts with more points than this are downsampled before plotting
+MAX_PLOT_POINTS = 2000
+
+def build_items_query(limit, offset, category_filter, fields_str):
+    """Build the items query for one page of the explorer"""
+    return f"""
+    query {{
+        items(
+            limit: {limit}
+            offset: {offset}
+            {category_filter}
+        ) {{
+            {fields_str}
+        }}
+    }}
+    """
+
+def fetch_explorer_page(state, page_number):
+    """Fetch one page of the explorer query into the session state"""
+    query = build_items_query(state["page_size"], state["start_offset"] + page_number * state["page_size"],
+                              state["category_filter"], state["fields_str"])
+    items = run_query(query).get("items", [])
+    state["pages"][page_number] = items
+    if len(items) < state["page_size"]:
+        state["last_page"] = page_number
+    return items
+
 if page == "Home":
     st.header("Welcome to the GraphQL Demo")
     
@@ -52,7 +80,7 @@ if page == "Home":
     
     with st.spinner("Loading data..."):
         try:
-            result = run_query(query)
+            result = run_cached_query(query)
             if result and "items" in result:
                 df = pd.DataFrame(result["items"])
                 st.dataframe(df)
@@ -62,6 +90,28 @@ if page == "Home":
                     st.subheader("Sample Visualization")
                     fig = px.bar(df, x="name", y="value", color="category", title="Sample Data Visualization")
                     st.plotly_chart(fig)
+                
+                # Distribution of the whole dataset, binned on the server
+                histogram_query = """
+                query {
+                    histogram(field: "value", bins: 20) {
+                        total
+                        bins {
+                            lower
+                            upper
+                            count
+                        }
+                    }
+                }
+                """
+                histogram = run_cached_query(histogram_query).get("histogram")
+                if histogram and histogram["bins"]:
+                    st.subheader("Value Distribution")
+                    bins_df = pd.DataFrame(histogram["bins"])
+                    bins_df["range"] = bins_df.apply(lambda b: f"{b['lower']:.1f} - {b['upper']:.1f}", axis=1)
+                    fig = px.bar(bins_df, x="range", y="count",
+                                 title=f"Distribution of value across {histogram['total']} items")
+                    st.plotly_chart(fig)
             else:
                 st.error("No data returned from the GraphQL API. Make sure the backend server is running.")
         except Exception as e:
@@ -74,8 +124,13 @@ elif page == "GraphQL Explorer":
     # Simple GraphQL query builder
     st.subheader("Build Your Query")
     
-    limit = st.slider("Limit", min_value=1, max_value=100, value=10)
-    offset = st.slider("Offset", min_value=0, max_value=100, value=0)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        page_size = st.select_slider("Page size", options=[10, 50, 100, 500, 1000, 5000], value=100)
+    with col2:
+        offset = st.number_input("Start offset", min_value=0, value=0, step=page_size)
+    with col3:
+        max_pages = st.slider("Pages kept in memory", min_value=1, max_value=50, value=10)
     
     # Get all available categories
     categories = []
@@ -88,7 +143,7 @@ elif page == "GraphQL Explorer":
             }
         }
         """
-        result = run_query(all_items_query)
+        result = run_cached_query(all_items_query)
         if result and "items" in result:
             # Extract unique categories
             categories = list(set([item["category"] for item in result["items"] if "category" in item]))
@@ -122,50 +177,90 @@ elif page == "GraphQL Explorer":
         st.warning("Please select at least one field.")
         selected_fields = ["id"]  # Default to at least one field
     
-    # Construct the query
+    # Construct the query for the first page
     fields_str = "\n            ".join(selected_fields)
-    query = f"""
-    query {{
-        items(
-            limit: {limit}
-            offset: {offset}
-            {category_filter}
-        ) {{
-            {fields_str}
-        }}
-    }}
-    """
+    query = build_items_query(page_size, offset, category_filter, fields_str)
     
     # Display the query
     st.subheader("Generated Query")
     st.code(query, language="graphql")
     
-    # Execute the query
+    # Execute the query. Further pages are fetched on demand and only a window of
+    # max_pages pages is kept in memory, evicting pages from the other end.
     if st.button("Run Query"):
+        st.session_state.explorer = {
+            "page_size": page_size,
+            "start_offset": offset,
+            "category_filter": category_filter,
+            "fields_str": fields_str,
+            "fields": list(selected_fields),
+            "pages": {},
+            "last_page": None,
+        }
         with st.spinner("Executing query..."):
             try:
-                result = run_query(query)
-                if result and "items" in result:
-                    st.success(f"Query returned {len(result['items'])} items")
-                    df = pd.DataFrame(result["items"])
-                    st.dataframe(df)
-                    
-                    # Add visualization if certain fields are selected
-                    if "value" in selected_fields and "name" in selected_fields:
-                        st.subheader("Data Visualization")
-                        
-                        if "category" in selected_fields:
-                            fig = px.bar(df, x="name", y="value", color="category", 
-                                        title="Item Values by Category")
-                        else:
-                            fig = px.bar(df, x="name", y="value", 
-                                        title="Item Values")
-                            
-                        st.plotly_chart(fig)
-                else:
-                    st.warning("No data returned from the query")
+                fetch_explorer_page(st.session_state.explorer, 0)
             except Exception as e:
                 st.error(f"Error executing query: {e}")
+    
+    if "explorer" in st.session_state and st.session_state.explorer["pages"]:
+        state = st.session_state.explorer
+        first_page, last_loaded = min(state["pages"]), max(state["pages"])
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Load previous page", disabled=first_page == 0):
+                try:
+                    fetch_explorer_page(state, first_page - 1)
+                    while len(state["pages"]) > max_pages:
+                        state["pages"].pop(max(state["pages"]))
+                except Exception as e:
+                    st.error(f"Error executing query: {e}")
+        with col2:
+            if st.button("Load next page", disabled=state["last_page"] == last_loaded):
+                try:
+                    fetch_explorer_page(state, last_loaded + 1)
+                    while len(state["pages"]) > max_pages:
+                        state["pages"].pop(min(state["pages"]))
+                except Exception as e:
+                    st.error(f"Error executing query: {e}")
+        
+        pages = sorted(state["pages"])
+        rows = [item for page_number in pages for item in state["pages"][page_number]]
+        window_start = state["start_offset"] + pages[0] * state["page_size"]
+        
+        if rows:
+            st.success(f"Showing rows {window_start} to {window_start + len(rows) - 1} "
+                       f"({len(pages)} page(s) in memory)")
+            df = pd.DataFrame(rows)
+            df.index = range(window_start, window_start + len(df))
+            st.dataframe(df)
+            
+            # Add visualization if certain fields are selected
+            if "value" in state["fields"] and "name" in state["fields"]:
+                st.subheader("Data Visualization")
+                color = "category" if "category" in state["fields"] else None
+                
+                if len(df) <= MAX_PLOT_POINTS:
+                    fig = px.bar(df, x="name", y="value", color=color,
+                                title="Item Values by Category" if color else "Item Values")
+                else:
+                    # Too many points to draw one bar each - plot a downsampled series
+                    method = st.radio("Downsampling", ["LTTB", "Min/Max buckets"], horizontal=True)
+                    positions = df.index.to_numpy()
+                    values = df["value"].to_numpy(dtype=float)
+                    if method == "LTTB":
+                        keep = lttb(positions, values, MAX_PLOT_POINTS)
+                    else:
+                        keep = minmax_downsample(values, MAX_PLOT_POINTS // 2)
+                    sampled = df.iloc[keep]
+                    fig = px.line(sampled, x=sampled.index, y="value", color=color, hover_name="name",
+                                  markers=True, labels={"x": "Row"},
+                                  title=f"Item Values ({len(sampled)} of {len(df)} points)")
+                
+                st.plotly_chart(fig)
+        else:
+            st.warning("No data returned from the query")
 
 elif page == "REST Comparison":
     # Call the function from the imported module
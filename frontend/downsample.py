@@ -0,0 +1,84 @@
+import numpy as np
+from typing import Sequence
+
+# Downsampling helpers for plotting large series.
+# Both functions return the (sorted) indices of the points to keep, so they
+# can be used to select rows from a DataFrame with df.iloc[indices].
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+    
+    Keeps the first and last points and, for every bucket in between, the point
+    forming the largest triangle with the point kept in the previous bucket and
+    the average of the next bucket. Preserves the visual shape of the series.
+    
+    Args:
+        x: X values, in increasing order
+        y: Y values
+        threshold: Number of points to keep
+        
+    Returns:
+        Array of indices of the points to keep
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    # Bucket boundaries for the points between the first and the last one
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # Average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Twice the area of the triangles formed with every point of the bucket
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    
+    return selected
+
+def minmax_downsample(y: Sequence[float], buckets: int) -> np.ndarray:
+    """
+    Bucketed min/max downsampling
+    
+    Splits the series into equally sized buckets and keeps the minimum and
+    maximum of each one, so peaks and troughs are never lost.
+    
+    Args:
+        y: Y values
+        buckets: Number of buckets (up to two points are kept per bucket)
+        
+    Returns:
+        Array of indices of the points to keep
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if buckets * 2 >= n or buckets < 1:
+        return np.arange(n)
+    
+    # Pad the series to a whole number of buckets so it can be reshaped
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padded = np.full(size * buckets, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    
+    min_idx = offsets + np.nanargmin(padded, axis=1)
+    max_idx = offsets + np.nanargmax(padded, axis=1)
+    return np.unique(np.concatenate([min_idx, max_idx]))
@@ -1,9 +1,16 @@
 import requests
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, List
 
-# GraphQL API endpoint
-GRAPHQL_URL = "http://localhost:8000/graphql"
+# API endpoints
+API_BASE_URL = "http://localhost:8000"
+GRAPHQL_URL = f"{API_BASE_URL}/graphql"
+GRAPHQL_WS_URL = GRAPHQL_URL.replace("http", "ws", 1)
+
+# Responses of GET queries keyed by operation, stored with their ETag
+# so repeated reads can be revalidated instead of downloaded again
+_response_cache: Dict[str, Dict[str, Any]] = {}
+RESPONSE_CACHE_SIZE = 128
 
 def run_query(query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
@@ -53,6 +60,159 @@ def run_query(query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[st
     except Exception as e:
         raise Exception(f"Error: {e}")
 
+def run_cached_query(query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Execute a read-only GraphQL query over GET, revalidating cached results
+    
+    The server tags GET responses with an ETag derived from the dataset version,
+    so an unchanged result comes back as an empty 304 Not Modified response and
+    the cached data is reused.
+    
+    Args:
+        query: The GraphQL query string
+        variables: Optional variables for the query
+        
+    Returns:
+        Dict containing the query results
+    
+    Raises:
+        Exception: If there's an error with the request or query
+    """
+    params = {"query": query}
+    if variables:
+        params["variables"] = json.dumps(variables, sort_keys=True)
+    
+    cache_key = json.dumps(params, sort_keys=True)
+    cached = _response_cache.get(cache_key)
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+    
+    try:
+        response = requests.get(GRAPHQL_URL, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached["data"]
+        response.raise_for_status()
+        
+        result = response.json()
+        if "errors" in result:
+            error_message = result["errors"][0]["message"]
+            raise Exception(f"GraphQL Error: {error_message}")
+        data = result.get("data") or {}
+        
+        etag = response.headers.get("ETag")
+        if etag:
+            _response_cache.pop(cache_key, None)
+            if len(_response_cache) >= RESPONSE_CACHE_SIZE:
+                # Evict the oldest entry
+                _response_cache.pop(next(iter(_response_cache)))
+            _response_cache[cache_key] = {"etag": etag, "data": data}
+        
+        return data
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Request Error: {e}")
+    except json.JSONDecodeError:
+        raise Exception("Invalid JSON response from the server")
+
+ITEM_CHANGES_SUBSCRIPTION = """
+subscription ItemChanges($category: String) {
+    itemChanges(category: $category) {
+        version
+        operation
+        id
+        item {
+            id
+            name
+            value
+            category
+        }
+    }
+}
+"""
+
+def subscribe_item_changes(category: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Subscribe to changes of the items view over WebSocket
+    
+    Args:
+        category: Optional category the view is filtered by
+        
+    Yields:
+        Dicts with the dataset version, the operation and the affected item
+    """
+    from gql import Client, gql
+    from gql.transport.websockets import WebsocketsTransport
+    
+    client = Client(transport=WebsocketsTransport(url=GRAPHQL_WS_URL))
+    for result in client.subscribe(gql(ITEM_CHANGES_SUBSCRIPTION), variable_values={"category": category}):
+        yield result["itemChanges"]
+
+def apply_item_change(view: Dict[str, Dict[str, Any]], change: Dict[str, Any]) -> bool:
+    """
+    Apply a change from subscribe_item_changes to a view of items keyed by ID
+    
+    Args:
+        view: The items currently held by the client, keyed by ID
+        change: The change pushed by the server
+        
+    Returns:
+        False if the view is no longer valid and has to be refetched, True otherwise
+    """
+    operation = change["operation"]
+    if operation == "RESET":
+        return False
+    if operation in ("INSERT", "UPDATE"):
+        view[change["id"]] = change["item"]
+    elif operation == "DELETE":
+        view.pop(change["id"], None)
+    return True
+
+def fetch_dataframe(columns: Optional[List[str]] = None,
+                    category: Optional[str] = None,
+                    min_value: Optional[float] = None,
+                    max_value: Optional[float] = None,
+                    format: str = "arrow"):
+    """
+    Load a column projection of the dataset straight into a DataFrame
+    
+    Uses the bulk export endpoint, which returns Arrow IPC or Parquet instead of
+    JSON, so no per-row decoding is needed on either side.
+    
+    Args:
+        columns: Columns to export (all columns if not given)
+        category: Optional category filter
+        min_value: Optional lower bound for value
+        max_value: Optional upper bound for value
+        format: "arrow" (Arrow IPC stream) or "parquet"
+        
+    Returns:
+        pandas DataFrame with the selected columns
+    
+    Raises:
+        Exception: If there's an error with the request
+    """
+    import pyarrow as pa
+    
+    params = {"format": format, "category": category, "min_value": min_value, "max_value": max_value}
+    if columns:
+        params["columns"] = ",".join(columns)
+    
+    try:
+        response = requests.get(f"{API_BASE_URL}/api/export",
+                                params={k: v for k, v in params.items() if v is not None})
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Request Error: {e}")
+    
+    # Wrap the response body without copying it
+    buffer = pa.py_buffer(response.content)
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(pa.BufferReader(buffer))
+    else:
+        table = pa.ipc.open_stream(buffer).read_all()
+    
+    # Release Arrow memory column by column while converting
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
 def measure_query_performance(query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Execute a GraphQL query and measure its performance
@@ -74,4 +234,26 @@ def measure_query_performance(query: str, variables: Optional[Dict[str, Any]] =
         "data": result,
         "execution_time": round((end_time - start_time) * 1000, 2),  # in milliseconds
         "timestamp": time.time()
-    }
\ No newline at end of file
+    }
+
+def run_rest_request(endpoint: str) -> Dict[str, Any]:
+    """
+    Execute a GET request against one of the REST endpoints
+    
+    Args:
+        endpoint: Path of the REST endpoint, e.g. "/api/items?limit=10"
+        
+    Returns:
+        Dict containing the decoded JSON response
+    
+    Raises:
+        Exception: If there's an error with the request
+    """
+    try:
+        response = requests.get(f"{API_BASE_URL}{endpoint}")
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Request Error: {e}")
+    except json.JSONDecodeError:
+        raise Exception("Invalid JSON response from the server")
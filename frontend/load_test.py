@@ -0,0 +1,112 @@
+import math
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable
+
+from graphql_client import API_BASE_URL, GRAPHQL_URL
+
+# Each worker thread keeps its own session so connections are reused
+# between requests without being shared across threads
+_thread_local = threading.local()
+
+def _get_session() -> requests.Session:
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+def _timed_request(method: str, url: str, **kwargs) -> Dict[str, Any]:
+    """
+    Perform a single HTTP request and record its latency and size
+    """
+    start_time = time.perf_counter()
+    try:
+        response = _get_session().request(method, url, **kwargs)
+        ok = response.ok
+        status = response.status_code
+        # Bytes on the wire: response.content is already decompressed
+        size = int(response.headers.get("Content-Length") or response.raw.tell())
+    except requests.exceptions.RequestException:
+        ok = False
+        status = None
+        size = 0
+    latency = (time.perf_counter() - start_time) * 1000  # in ms
+    
+    return {"latency": latency, "bytes": size, "ok": ok, "status": status}
+
+def graphql_scenario(query: str) -> Callable[[], List[Dict[str, Any]]]:
+    """
+    Build a scenario that fetches the data with a single GraphQL request
+    """
+    def run() -> List[Dict[str, Any]]:
+        return [_timed_request("POST", GRAPHQL_URL, json={"query": query})]
+    return run
+
+def rest_scenario(endpoints: List[str]) -> Callable[[], List[Dict[str, Any]]]:
+    """
+    Build a scenario that fetches the data by calling each REST endpoint in turn
+    """
+    def run() -> List[Dict[str, Any]]:
+        return [_timed_request("GET", f"{API_BASE_URL}{endpoint}") for endpoint in endpoints]
+    return run
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of a list of values (q in the range 0-100)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def run_load_test(scenario: Callable[[], List[Dict[str, Any]]],
+                  iterations: int = 50,
+                  concurrency: int = 5) -> Dict[str, Any]:
+    """
+    Run a scenario repeatedly with a fixed number of concurrent workers
+    
+    Args:
+        scenario: Callable performing one logical fetch and returning its request samples
+        iterations: Total number of times the scenario is executed
+        concurrency: Number of scenarios in flight at the same time
+        
+    Returns:
+        Dict containing throughput, latency percentiles, request counts and bytes transferred
+    """
+    def run_iteration() -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        samples = scenario()
+        return {
+            "latency": (time.perf_counter() - start_time) * 1000,
+            "samples": samples
+        }
+    
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: run_iteration(), range(iterations)))
+    elapsed = time.perf_counter() - start_time
+    
+    scenario_latencies = [r["latency"] for r in results]
+    samples = [s for r in results for s in r["samples"]]
+    request_latencies = [s["latency"] for s in samples]
+    
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput": iterations / elapsed if elapsed else 0.0,  # scenarios per second
+        "requests": len(samples),
+        "requests_per_s": len(samples) / elapsed if elapsed else 0.0,
+        "errors": sum(1 for s in samples if not s["ok"]),
+        "rejected": sum(1 for s in samples if s["status"] == 503),  # shed by admission control
+        "bytes": sum(s["bytes"] for s in samples),
+        "p50": percentile(scenario_latencies, 50),
+        "p95": percentile(scenario_latencies, 95),
+        "p99": percentile(scenario_latencies, 99),
+        "request_p50": percentile(request_latencies, 50),
+        "request_p99": percentile(request_latencies, 99),
+    }
@@ -1,9 +1,9 @@
 import streamlit as st
 import pandas as pd
 import time
-import requests
 import json
-from graphql_client import run_query, GRAPHQL_URL
+from graphql_client import run_query, run_rest_request
+from load_test import run_load_test, graphql_scenario, rest_scenario
 
 def display_rest_comparison():
     """
@@ -76,6 +76,10 @@ def display_rest_comparison():
                         name
                         category
                         value
+                        details {
+                            description
+                            createdAt
+                        }
                     }
                 }
             """,
@@ -134,55 +138,20 @@ def display_rest_comparison():
         for endpoint in scenario["rest_endpoints"]:
             st.code(endpoint, language="text")
         
-        # Simulate REST API calls with timing
-        if st.button("Simulate REST API Calls"):
-            with st.spinner("Simulating REST API calls..."):
+        # Execute the REST API calls with timing
+        if st.button("Run REST API Calls"):
+            with st.spinner("Executing REST API calls..."):
                 start_time = time.time()
                 total_data_size = 0
                 
                 try:
-                    # Simulate multiple REST API calls
+                    # Call each endpoint in turn, as a REST client would
                     results = []
-                    base_url = "http://localhost:8000"  # would be the REST API base URL
                     
                     for endpoint in scenario["rest_endpoints"]:
-                        # Just simulate the timing, don't actually make the request
-                        # since we're demonstrating the concept
-                        time.sleep(0.2)  # simulate network latency for each request
-                        
-                        # Create detailed dummy responses based on endpoint
-                        if "/details" in endpoint:
-                            item_id = endpoint.split("/")[-2]
-                            dummy_response = {
-                                "id": item_id,
-                                "name": f"Item {item_id}",
-                                "details": {
-                                    "description": f"Detailed description for item {item_id}",
-                                    "created_at": "2023-05-10T14:30:00Z",
-                                    "updated_at": "2023-05-15T09:45:00Z",
-                                    "extra_info": "Additional data that comes with every request"
-                                },
-                                "endpoint": endpoint
-                            }
-                        else:
-                            # General listing endpoint
-                            dummy_response = {
-                                "data": [
-                                    {"id": "1", "name": "Item 1", "value": 10.5, "category": "A", 
-                                     "created_at": "2023-05-10T14:30:00Z", "extra_field1": "value1", "extra_field2": "value2"},
-                                    {"id": "2", "name": "Item 2", "value": 20.0, "category": "B",
-                                     "created_at": "2023-05-11T10:15:00Z", "extra_field1": "value3", "extra_field2": "value4"}
-                                ],
-                                "pagination": {
-                                    "total": 10,
-                                    "page": 1,
-                                    "limit": 10
-                                },
-                                "endpoint": endpoint
-                            }
-                        
-                        results.append(dummy_response)
-                        total_data_size += len(json.dumps(dummy_response))
+                        response = run_rest_request(endpoint)
+                        results.append(response)
+                        total_data_size += len(json.dumps(response))
                     
                     end_time = time.time()
                     execution_time = (end_time - start_time) * 1000  # in ms
@@ -203,7 +172,50 @@ def display_rest_comparison():
                     st.session_state.rest_requests = len(scenario["rest_endpoints"])
                     st.session_state.rest_data_size = total_data_size
                 except Exception as e:
-                    st.error(f"Error simulating REST API calls: {e}")
+                    st.error(f"Error executing REST API calls: {e}")
+    
+    # Concurrent load test against both APIs
+    st.subheader("Load Test")
+    st.markdown("""
+    Run the selected scenario repeatedly against both APIs with several requests in flight
+    at once. Latencies are measured per scenario, i.e. for all the requests needed to fetch the data.
+    """)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        concurrency = st.slider("Concurrency", min_value=1, max_value=32, value=4)
+    with col2:
+        iterations = st.slider("Iterations", min_value=10, max_value=500, value=50, step=10)
+    
+    if st.button("Run Load Test"):
+        with st.spinner(f"Running {iterations} iterations at concurrency {concurrency}..."):
+            try:
+                graphql_stats = run_load_test(graphql_scenario(scenario["graphql_query"]), iterations, concurrency)
+                rest_stats = run_load_test(rest_scenario(scenario["rest_endpoints"]), iterations, concurrency)
+                
+                st.session_state.load_test_results = {"GraphQL": graphql_stats, "REST": rest_stats}
+            except Exception as e:
+                st.error(f"Error running load test: {e}")
+    
+    if "load_test_results" in st.session_state:
+        load_results = st.session_state.load_test_results
+        metrics = [
+            ("Throughput (scenarios/s)", "throughput", "{:.1f}"),
+            ("Requests/s", "requests_per_s", "{:.1f}"),
+            ("p50 latency (ms)", "p50", "{:.2f}"),
+            ("p95 latency (ms)", "p95", "{:.2f}"),
+            ("p99 latency (ms)", "p99", "{:.2f}"),
+            ("Per-request p99 (ms)", "request_p99", "{:.2f}"),
+            ("Total requests", "requests", "{}"),
+            ("Failed requests", "errors", "{}"),
+            ("Rejected (503)", "rejected", "{}"),
+            ("Bytes transferred", "bytes", "{:,}"),
+        ]
+        st.table(pd.DataFrame({
+            "Metric": [label for label, _, _ in metrics],
+            "GraphQL": [fmt.format(load_results["GraphQL"][key]) for _, key, fmt in metrics],
+            "REST": [fmt.format(load_results["REST"][key]) for _, key, fmt in metrics],
+        }))
     
     # Show comparison results if both methods have been executed
     if hasattr(st.session_state, 'graphql_time') and hasattr(st.session_state, 'rest_time'):